@@ -0,0 +1,57 @@
+import pandas as pd
+import streamlit as st
+
+from instrumentation import ADMIN_PANEL, last_run, snapshot, startup_report, to_json, to_prometheus
+
+
+# =============================
+# Admin Sidebar
+# =============================
+def admin_enabled():
+    return ADMIN_PANEL or st.query_params.get("admin") == "1"
+
+
+def metrics_sidebar():
+    # Call after instrumentation.finish_run() so the last rerun is complete
+    if not admin_enabled():
+        return
+
+    with st.sidebar.expander("⏱️ Performance"):
+        run = last_run()
+        if run:
+            st.caption(f"Last rerun of **{run['page']}**: {run['seconds']:.3f} s")
+            st.dataframe(
+                pd.DataFrame(run["stages"], columns=["Stage", "Seconds"]),
+                hide_index=True,
+                use_container_width=True
+            )
+
+        startup = startup_report()
+        if startup["pages"]:
+            st.caption(f"Startup (process up {startup['uptime']:,.0f} s)")
+            st.dataframe(
+                pd.DataFrame.from_dict(startup["pages"], orient="index").rename_axis("Page").reset_index(),
+                hide_index=True,
+                use_container_width=True
+            )
+
+        data = snapshot()
+        if data["queries"]:
+            queries = (
+                pd.DataFrame.from_dict(data["queries"], orient="index")
+                .rename_axis("Query")
+                .reset_index()
+                .sort_values("seconds", ascending=False)
+            )
+            st.caption("SQL (all sessions)")
+            st.dataframe(queries, hide_index=True, use_container_width=True)
+
+        if data["counters"]:
+            st.caption("Cache counters")
+            st.json(data["counters"])
+
+        col_prom, col_json = st.columns(2)
+        with col_prom:
+            st.download_button("Prometheus", to_prometheus(), "dashboard_metrics.txt", "text/plain")
+        with col_json:
+            st.download_button("JSON", to_json(), "dashboard_metrics.json", "application/json")
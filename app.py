@@ -1,5 +1,9 @@
+import time
+
 import streamlit as st
 
+from instrumentation import record_page_run
+
 pages = {
     "System Option": [
         st.Page("dashboard.py", title="Dashboard"),
@@ -9,4 +13,11 @@ pages = {
 }
 
 pg = st.navigation(pages)
-pg.run()
\ No newline at end of file
+
+# Pages import their heavy modules on first use, so the first run of
+# each page in a process is its cold-start cost (see the admin panel).
+started = time.perf_counter()
+try:
+    pg.run()
+finally:
+    record_page_run(pg.title, time.perf_counter() - started)
\ No newline at end of file
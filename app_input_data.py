@@ -1,21 +1,27 @@
-from dotenv import load_dotenv
 import streamlit as st
-import pandas as pd
-import plotly.express as px
+import os
 # from streamlit_autorefresh import st_autorefresh
 from datetime import date
-import os
 from database_connect import (
-    create_connection,
-    insert_production_record,
-    create_production_table,
-    delete_production_record
+    get_connection,
+    pool_stats,
+    insert_production_records,
+    delete_production_record,
+    yield_by_station_day
 )
+from migrations import initialize_database
+from pagination import invalidate_counts
+from records_view import paginated_records
+from record_import import read_shift_sheet
+from record_export import EXPORT_FORMATS, EXPORT_MAX_ROWS, export_records
+from write_queue import submit_record
+import resources
+from admin_panel import metrics_sidebar
+from instrumentation import finish_run, start_run, timed
 
 from data_info import (
     CUSTOM_ORDER, 
     CUSTOM_ORDER_TIME, 
-    DATABASE_COLOUMNS,
     OPERATOR_LIST,
     SUPPLIER_LIST,
     MODULE_TYPE_LIST
@@ -32,25 +38,32 @@ st.set_page_config(
 )
 
 
-load_dotenv()
+start_run("input")
+with timed("input.pool"):
+    resources.connection_pool()
+    maintenance = resources.maintenance_worker()
 
-conn = create_connection(
-    os.getenv("DB_NAME", "mydb"),
-    os.getenv("DB_USER", "postgres"),
-    os.getenv("DB_PASSWORD", "123"),
-    os.getenv("DB_HOST", "localhost"),
-    os.getenv("DB_PORT", "5432")
-)
+with timed("input.init_database"), get_connection() as conn:
+    if conn:
+        initialize_database(conn)
+    else:
+        st.error("❌ Database connection failed")
 
-if conn:
-    create_production_table(conn)
-    record = pd.read_sql(
-        "SELECT * FROM production_data;",
-        conn
+with st.sidebar.expander("🔌 Database Pool"):
+    st.json(pool_stats())
+
+with st.sidebar.expander("📮 Write Queue"):
+    write_queue, write_worker = resources.write_queue()
+    st.metric("Pending records", write_queue.pending_count())
+    st.json(write_worker.status)
+
+with st.sidebar.expander("🧹 Database Maintenance"):
+    st.json(maintenance.status)
+if maintenance.status["default_partition_rows"]:
+    st.sidebar.error(
+        f"❌ {maintenance.status['default_partition_rows']:,} records landed in the "
+        f"default partition; partition maintenance needs attention"
     )
-else:
-    st.error("❌ Database connection failed")
-    record = pd.DataFrame(columns=DATABASE_COLOUMNS)
 
 
 # -----------------------------
@@ -199,53 +212,174 @@ if submit:
         "Operator Name": operator_select,
         "Remarks": defect_type
     }
+    # Queued on local disk; the write queue worker commits it to the
+    # database in the background and retries while it is unreachable.
     try:
-        insert_production_record(conn, new_record)
-        record = pd.read_sql(
-        "SELECT * FROM production_data;",
-        conn
-        )
-        st.success("✅ Record saved successfully!")
+        st.session_state["last_ticket"] = submit_record(new_record)
+        st.session_state.pop("last_ticket_status", None)
     except Exception as e:
         st.error(f"❌ Error saving record: {e}")
 
 
+def show_submission(ticket, status):
+    if status["state"] == "committed":
+        st.success(f"✅ Record #{ticket} saved")
+    elif status["state"] == "rejected":
+        st.error(f"❌ Record #{ticket} rejected: {status['last_error']}")
+    elif status["state"] == "queued":
+        detail = f" (retrying: {status['last_error']})" if status["last_error"] else ""
+        st.info(f"🕓 Record #{ticket} queued{detail}")
+
+
+@st.fragment(run_every=2)
+def submission_status(ticket):
+    queue, _ = resources.write_queue()
+    status = queue.status(ticket)
+    if status["state"] != "queued":
+        # Final: keep the result and rerun the page without this poller
+        st.session_state["last_ticket_status"] = status
+        st.rerun()
+    show_submission(ticket, status)
+
+last_ticket = st.session_state.get("last_ticket")
+if last_ticket is not None:
+    if "last_ticket_status" in st.session_state:
+        show_submission(last_ticket, st.session_state["last_ticket_status"])
+    else:
+        submission_status(last_ticket)
+
+
+with st.expander("📤 Import Shift Sheet (CSV / Excel)"):
+    uploaded_sheet = st.file_uploader(
+        "Back-dated shift records",
+        type=["csv", "xlsx", "xls"],
+        help="Columns: Date, Station Name, Model Type, Batch Number, Tray Number, "
+             "Product Line, Supplier, OK Quantity, NG Quantity, Operator Name, Remarks"
+    )
+    import_button = st.button(
+        "Import Records",
+        disabled=uploaded_sheet is None
+    )
+
+    if import_button:
+        try:
+            with get_connection() as conn:
+                if conn is None:
+                    raise ConnectionError("database unavailable")
+                imported = insert_production_records(conn, read_shift_sheet(uploaded_sheet))
+            invalidate_counts("production_data")
+            st.success(f"✅ Imported {imported:,} records")
+        except Exception as e:
+            st.error(f"❌ Import failed, nothing was saved: {e}")
+
+
 with st.container(height=500):
     st.subheader("📋 Production Records")
-    st.dataframe(
-        record,
-        use_container_width=True,
-        hide_index=False
-    )
+    with timed("input.records_page"):
+        record_filters, page = paginated_records(
+            "records",
+            "production_data",
+            {
+                "station_name": ("Station", CUSTOM_ORDER),
+                "model_type": ("Model", MODULE_TYPE_LIST),
+                "product_line": ("Line", ["Indo #1", "Indo #2"]),
+                "production_date": ("Date range", "date"),
+            },
+            height=300
+        )
+
+
+
+with st.expander("📊 Station Yield (filtered records)"):
+    # Aggregated in Postgres: only one row per station and day comes back
+    date_filter = record_filters.get("production_date", (None, None))
+    with timed("input.station_yield"), get_connection() as conn:
+        if conn is None:
+            st.error("❌ Database connection failed")
+            station_yield = None
+        else:
+            station_yield = yield_by_station_day(
+                conn,
+                start=date_filter[0],
+                end=date_filter[1],
+                stations=record_filters.get("station_name"),
+                model_types=record_filters.get("model_type"),
+                product_lines=record_filters.get("product_line")
+            )
 
+    if station_yield is not None:
+        station_totals = station_yield.groupby("Station", as_index=False)[["OK", "NG"]].sum()
+        station_totals["Yield"] = station_totals["OK"] / (station_totals["OK"] + station_totals["NG"]).where(lambda t: t > 0)
+        st.dataframe(
+            station_totals,
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "OK": st.column_config.NumberColumn(format="localized"),
+                "NG": st.column_config.NumberColumn(format="localized"),
+                "Yield": st.column_config.NumberColumn(format="percent"),
+            }
+        )
 
 
 with st.container(height=200, width=2000):
 
     col_down, col_edit, col_reset = st.columns([1,1,1])
 
-    has_data = len(record) > 0
+    page_ids = page["id"].tolist() if "id" in page else []
 
     
     with col_down:
-        st.markdown("<div style='margin-top: 30px;'></div>", unsafe_allow_html=True)
-        st.download_button(
-            "⬇️ Download CSV",
-            record.to_csv(index=False),
-            "cob_production_records.csv",
-            "text/csv",
-            use_container_width=True
+        # Built only when asked for, streamed from the database with the
+        # record filters above. The button is only rendered on the run that
+        # built the file: it reads the file once and the file is removed.
+        # Streamlit keeps what the button serves in memory, hence the cap.
+        col_format, col_prepare = st.columns([1, 1])
+        with col_format:
+            export_format = st.selectbox("Export", list(EXPORT_FORMATS), key="export_format")
+        with col_prepare:
+            st.markdown("<div style='margin-top: 28px;'></div>", unsafe_allow_html=True)
+            prepare_export = st.button(
+                "📦 Prepare",
+                use_container_width=True,
+                help=f"Exports up to {EXPORT_MAX_ROWS:,} records; the file is held in server memory while it is offered"
             )
 
+        if prepare_export:
+            try:
+                with timed("input.export"):
+                    path, rows, truncated = export_records("production_data", record_filters, export_format)
+            except Exception as e:
+                st.error(f"❌ Export failed: {e}")
+            else:
+                if truncated:
+                    st.warning(
+                        f"⚠️ Only the first {EXPORT_MAX_ROWS:,} matching records were exported; "
+                        f"narrow the filters to export the rest"
+                    )
+                suffix, mime = EXPORT_FORMATS[export_format]
+                try:
+                    with open(path, "rb") as f:
+                        st.download_button(
+                            f"⬇️ Download {export_format} ({rows:,} rows)",
+                            f,
+                            f"cob_production_records{suffix}",
+                            mime,
+                            on_click="ignore",
+                            use_container_width=True
+                            )
+                finally:
+                    os.remove(path)
+
 
     with col_edit:
         option_edit_row = st.selectbox(
-            label="Row to Delete",
-            options=record.index.tolist() if has_data else [],
-            index=len(record) - 1 if has_data else 0,
+            label="Record ID to Delete",
+            options=page_ids,
+            index=0 if page_ids else None,
             placeholder="Select row to delete",
-            help="Select a row to delete from the records",
-            disabled=not has_data
+            help="Select a record on the current page to delete",
+            disabled=not page_ids
         )
 
     with col_reset:
@@ -254,19 +388,23 @@ with st.container(height=200, width=2000):
         delete_button = st.button(
             "Delete",
             type="primary",
-            disabled=not has_data,
+            disabled=not page_ids,
             use_container_width=True
         )
     if delete_button:
         try:
-            row_id = record.iloc[option_edit_row]['id']
+            row_id = option_edit_row
             st.write(f"Deleting record ID: {row_id}")
-            delete_production_record(conn, int(row_id))
-            record = pd.read_sql(
-                "SELECT * FROM production_data;",
-                conn
-            )   
+            with get_connection() as conn:
+                if conn is None:
+                    raise ConnectionError("database unavailable")
+                delete_production_record(conn, int(row_id))
+            invalidate_counts("production_data")
         except Exception as e:
             st.error(f"❌ Error deleting record: {e}")
-        
+        else:
+            st.rerun()
+
 
+finish_run()
+metrics_sidebar()
@@ -1,8 +1,8 @@
 import streamlit as st
-import pandas as pd
 from datetime import date
-from sqlalchemy import text
-from db import engine
+from database_connect import get_connection, execute_query, pool_stats
+from pagination import distinct_values, invalidate_counts, sum_columns
+from records_view import paginated_records
 
 st.set_page_config(
     page_title="Production Dashboard",
@@ -14,6 +14,9 @@ st.set_page_config(
 # -------------------------
 st.title("📊 Production Dashboard (Supabase + PostgreSQL)")
 
+with st.sidebar.expander("🔌 Database Pool"):
+    st.json(pool_stats())
+
 # -------------------------
 # FORM INPUT
 # -------------------------
@@ -44,31 +47,36 @@ with st.form("production_form", clear_on_submit=True):
         if not station_name or not model_type:
             st.error("Station Name and Model Type are required!")
         else:
-            query = text("""
+            query = """
                 INSERT INTO production_dashboard
                 (production_date, station_name, model_type,
                  ok_quantity, ng_quantity, production_time_min,
                  batch_number, product_line)
                 VALUES
-                (:date, :station, :model, :ok, :ng, :ptime, :batch, :line)
-            """)
-
-            with engine.begin() as conn:
-                conn.execute(
-                    query,
-                    {
-                        "date": production_date,
-                        "station": station_name,
-                        "model": model_type,
-                        "ok": ok_qty,
-                        "ng": ng_qty,
-                        "ptime": production_time,
-                        "batch": batch_number,
-                        "line": product_line
-                    }
-                )
-
-            st.success("✅ Data successfully saved!")
+                (%(date)s, %(station)s, %(model)s, %(ok)s, %(ng)s,
+                 %(ptime)s, %(batch)s, %(line)s)
+            """
+
+            with get_connection() as conn:
+                if conn is None:
+                    st.error("❌ Database connection failed")
+                else:
+                    execute_query(
+                        conn,
+                        query,
+                        {
+                            "date": production_date,
+                            "station": station_name,
+                            "model": model_type,
+                            "ok": ok_qty,
+                            "ng": ng_qty,
+                            "ptime": production_time,
+                            "batch": batch_number,
+                            "line": product_line
+                        }
+                    )
+                    invalidate_counts("production_dashboard")
+                    st.success("✅ Data successfully saved!")
 
 # -------------------------
 # LOAD DATA
@@ -76,13 +84,19 @@ with st.form("production_form", clear_on_submit=True):
 st.divider()
 st.subheader("📋 Production Data")
 
-df = pd.read_sql(
-    "SELECT * FROM production_dashboard ORDER BY production_date DESC",
-    engine
-)
+with get_connection() as conn:
+    station_options = (
+        distinct_values(conn, "production_dashboard", "station_name") if conn else []
+    )
 
-if not df.empty:
-    df = df.rename(columns={
+filters, df = paginated_records(
+    "dashboard_records",
+    "production_dashboard",
+    {
+        "station_name": ("Station Name", station_options),
+        "production_date": ("Date range", "date"),
+    },
+    column_labels={
         "production_date": "Date",
         "station_name": "Station Name",
         "model_type": "Model Type",
@@ -91,17 +105,23 @@ if not df.empty:
         "production_time_min": "Production Time",
         "batch_number": "Batch Number",
         "product_line": "Product Line"
-    })
-
-    st.dataframe(df, use_container_width=True)
+    }
+)
 
+if not df.empty:
     # -------------------------
     # KPI METRICS
     # -------------------------
     st.subheader("📈 KPI Summary")
 
-    total_ok = df["OK Quantity"].sum()
-    total_ng = df["NG Quantity"].sum()
+    with get_connection() as conn:
+        totals = (
+            sum_columns(conn, "production_dashboard", ["ok_quantity", "ng_quantity"], filters)
+            if conn else {"ok_quantity": 0, "ng_quantity": 0}
+        )
+
+    total_ok = totals["ok_quantity"]
+    total_ng = totals["ng_quantity"]
     total_prod = total_ok + total_ng
 
     col1, col2, col3 = st.columns(3)
@@ -0,0 +1,287 @@
+import argparse
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from chart_buckets import downsample
+from data_info import CUSTOM_ORDER, MODULE_TYPE_LIST, OPERATOR_LIST, SUPPLIER_LIST
+from filter_engine import FilterIndex
+from prepared_frame import CUSTOM_ORDER_TIME, prepare_rows
+from rollups import HOURLY_KEYS, _sum
+
+# =============================
+# Settings
+# =============================
+# python benchmark.py --rows 10000 1000000 --backend sqlite
+DEFAULT_ROWS = [10_000, 1_000_000, 10_000_000]
+SEED = 42
+# Roughly this many sheet rows per day, so bigger sizes also span more days
+ROWS_PER_DAY = 2_000
+MAX_DAYS = 730
+
+PRODUCTION_COLUMNS = [
+    "id", "station_name", "model_type", "batch_number", "tray_number",
+    "product_line", "supplier_name", "ok_quantity", "ng_quantity",
+    "operator_name", "remarks", "production_date",
+]
+
+
+# =============================
+# Synthetic Data
+# =============================
+def _days(rows):
+    return int(min(max(rows // ROWS_PER_DAY, 7), MAX_DAYS))
+
+
+def sheet_rows(rows, seed=SEED):
+    # Sheet layout read by the dashboard: Date, Time, Station, TYPE, Batch, OK, NG
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp.today().normalize() - pd.Timedelta(days=_days(rows) - 1)
+    dates = pd.date_range(start, periods=_days(rows)).strftime("%Y-%m-%d").to_numpy()
+    batches = np.array([f"Batch {i}" for i in range(1, 41)])
+
+    return pd.DataFrame({
+        "Date": dates[rng.integers(0, len(dates), rows)],
+        "Time": np.array(CUSTOM_ORDER_TIME)[rng.integers(0, len(CUSTOM_ORDER_TIME), rows)],
+        "Station": np.array(CUSTOM_ORDER)[rng.integers(0, len(CUSTOM_ORDER), rows)],
+        "TYPE": np.array(MODULE_TYPE_LIST)[rng.integers(0, len(MODULE_TYPE_LIST), rows)],
+        "Batch": batches[rng.integers(0, len(batches), rows)],
+        "OK": rng.integers(0, 200, rows),
+        "NG": rng.integers(0, 10, rows),
+    })
+
+
+def production_rows(rows, seed=SEED):
+    # production_data layout written by the input page
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp.today().normalize()
+    seconds = rng.integers(0, _days(rows) * 86_400, rows)
+
+    return pd.DataFrame({
+        "id": np.arange(1, rows + 1),
+        "station_name": np.array(CUSTOM_ORDER)[rng.integers(0, len(CUSTOM_ORDER), rows)],
+        "model_type": np.array(MODULE_TYPE_LIST)[rng.integers(0, len(MODULE_TYPE_LIST), rows)],
+        "batch_number": rng.integers(1, 41, rows),
+        "tray_number": rng.integers(1, 21, rows),
+        "product_line": np.array(["Indo #1", "Indo #2"])[rng.integers(0, 2, rows)],
+        "supplier_name": np.array(SUPPLIER_LIST)[rng.integers(0, len(SUPPLIER_LIST), rows)],
+        "ok_quantity": rng.integers(0, 200, rows),
+        "ng_quantity": rng.integers(0, 10, rows),
+        "operator_name": np.array(OPERATOR_LIST)[rng.integers(0, len(OPERATOR_LIST), rows)],
+        "remarks": "",
+        "production_date": end - pd.to_timedelta(np.sort(seconds)[::-1], unit="s"),
+    })
+
+
+# =============================
+# Stand-in Databases
+# =============================
+def load_sqlite(frame, path):
+    with sqlite3.connect(path) as db:
+        frame.to_sql("production_data", db, if_exists="replace", index=False, chunksize=100_000)
+
+
+def read_sqlite(path):
+    with sqlite3.connect(path) as db:
+        return pd.read_sql("SELECT * FROM production_data;", db)
+
+
+def load_postgres(frame, connection):
+    # Session-local temp table: nothing is left behind in the real database
+    from database_connect import CREATE_TABLE_QUERY
+
+    create = CREATE_TABLE_QUERY.replace(
+        "CREATE TABLE IF NOT EXISTS production_data (",
+        "CREATE TEMP TABLE bench_production_data (",
+    )
+    buffer = io.StringIO()
+    frame.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    with connection.cursor() as cursor:
+        cursor.execute("DROP TABLE IF EXISTS bench_production_data;")
+        cursor.execute(create)
+        cursor.copy_expert(
+            f"COPY bench_production_data ({', '.join(PRODUCTION_COLUMNS)}) FROM STDIN WITH CSV",
+            buffer,
+        )
+    connection.commit()
+
+
+def read_postgres(connection):
+    return pd.read_sql("SELECT * FROM bench_production_data;", connection)
+
+
+# =============================
+# Timing
+# =============================
+class Bench:
+    # Wall time, throughput and traced peak memory for each stage. Time
+    # and memory come from separate runs of the stage: tracemalloc slows
+    # allocation-heavy code by a large, stage-dependent factor, so it is
+    # never active while the clock runs.
+
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.results = []
+
+    def stage(self, size, name, rows, fn, *args):
+        started = time.perf_counter()
+        value = fn(*args)
+        elapsed = time.perf_counter() - started
+
+        peak_mb = None
+        if self.memory:
+            tracemalloc.start()
+            try:
+                fn(*args)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            peak_mb = round(peak / 1024 / 1024, 1)
+
+        self.results.append({
+            "size": size,
+            "stage": name,
+            "seconds": round(elapsed, 4),
+            "rows_per_sec": round(rows / elapsed) if elapsed > 0 else None,
+            "peak_mb": peak_mb,
+        })
+        peak_text = f"{peak_mb:>9.1f} MB" if peak_mb is not None else f"{'-':>12}"
+        print(
+            f"{size:>12,}  {name:<22} {elapsed:>9.3f} s  "
+            f"{self.results[-1]['rows_per_sec'] or 0:>14,} rows/s  {peak_text}"
+        )
+        return value
+
+
+# =============================
+# Pipelines
+# =============================
+def bench_dashboard(bench, size, workdir, figures=True):
+    raw = sheet_rows(size)
+    path = os.path.join(workdir, "sheet.csv")
+    raw.to_csv(path, index=False)
+    del raw
+
+    raw = bench.stage(size, "sheet load (csv)", size, pd.read_csv, path)
+    prepared = bench.stage(size, "datetime parse/prepare", size, prepare_rows, raw)
+    hourly = bench.stage(size, "hourly rollup", len(prepared), _sum, prepared, HOURLY_KEYS)
+    index = bench.stage(
+        size, "filter index build", len(hourly),
+        FilterIndex, hourly, ("TYPE", "Batch", "Station", "ISO_Year", "ISO_Week"),
+    )
+
+    end = hourly["Date"].max()
+    date_range = (end - pd.Timedelta(days=6), end)
+    selection = bench.stage(
+        size, "filter chain", len(hourly),
+        lambda: index.select(date_range=date_range, TYPE="TX", Station=CUSTOM_ORDER[:6]).frame(),
+    )
+
+    bench.stage(
+        size, "pivot", len(selection),
+        lambda: selection.pivot_table(
+            index="Time", columns="Station", values="OK",
+            aggfunc="sum", fill_value=0, observed=True,
+        ),
+    )
+    top5 = bench.stage(
+        size, "groupby/top-5", len(hourly),
+        lambda: hourly.groupby(["TYPE", "Station"], as_index=False, observed=True)["NG"].sum().nlargest(5, "NG"),
+    )
+    bench.stage(
+        size, "melt", len(selection),
+        lambda: selection.groupby("Station", observed=True)[["OK", "NG"]].sum().reset_index()
+        .melt(id_vars="Station", value_vars=["OK", "NG"], var_name="Status", value_name="Count"),
+    )
+
+    if figures:
+        import plotly.express as px
+
+        chart_df, _ = bench.stage(
+            size, "downsample", len(selection),
+            downsample, selection, "DateTime", "Station", ["OK"],
+        )
+        bench.stage(
+            size, "figure build+json", len(chart_df),
+            lambda: px.bar(chart_df, x="DateTime", y="OK", color="Station", barmode="group").to_json(),
+        )
+        bench.stage(
+            size, "top-5 figure+json", len(top5),
+            lambda: px.scatter(top5, x="Station", y="NG", color="Station", symbol="TYPE").to_json(),
+        )
+
+
+def bench_input_page(bench, size, workdir, backend):
+    frame = production_rows(size)
+
+    if backend == "postgres":
+        from database_connect import get_connection
+
+        with get_connection() as conn:
+            if conn is None:
+                raise ConnectionError("database unavailable")
+            bench.stage(size, "db write (copy)", size, load_postgres, frame, conn)
+            del frame
+            records = bench.stage(size, "db read", size, read_postgres, conn)
+    else:
+        path = os.path.join(workdir, "production.sqlite3")
+        bench.stage(size, "db write (sqlite)", size, load_sqlite, frame, path)
+        del frame
+        records = bench.stage(size, "db read", size, read_sqlite, path)
+
+    records = bench.stage(
+        size, "datetime parse", size,
+        lambda: records.assign(production_date=pd.to_datetime(records["production_date"])),
+    )
+    start = records["production_date"].max() - pd.Timedelta(days=6)
+    bench.stage(
+        size, "filter chain", size,
+        lambda: records[
+            (records["production_date"] >= start)
+            & records["station_name"].isin(CUSTOM_ORDER[:6])
+            & (records["model_type"] == "TX")
+        ],
+    )
+    bench.stage(
+        size, "groupby station", size,
+        lambda: records.groupby("station_name")[["ok_quantity", "ng_quantity"]].sum(),
+    )
+
+
+# =============================
+# CLI
+# =============================
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dashboard and input page data paths")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS)
+    parser.add_argument("--backend", choices=["sqlite", "postgres"], default="sqlite")
+    parser.add_argument("--only", choices=["dashboard", "input"], default=None)
+    parser.add_argument("--no-figures", action="store_true", help="skip Plotly figure stages")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced peak-memory runs")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    bench = Bench(memory=not args.no_memory)
+    print(f"{'rows':>12}  {'stage':<22} {'time':>11}  {'throughput':>21}  {'peak':>12}")
+    for size in args.rows:
+        with tempfile.TemporaryDirectory(prefix="dashboard_bench_") as workdir:
+            if args.only in (None, "dashboard"):
+                bench_dashboard(bench, size, workdir, figures=not args.no_figures)
+            if args.only in (None, "input"):
+                bench_input_page(bench, size, workdir, args.backend)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(bench.results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import select
+import threading
+
+import psycopg2
+from psycopg2 import InterfaceError, OperationalError
+
+from database_connect import connection_settings
+
+CHANNEL = "production_data_changed"
+POLL_TIMEOUT = 5.0
+MAX_BACKOFF = 60.0
+
+
+# =============================
+# LISTEN/NOTIFY Worker
+# =============================
+class ChangeListener(threading.Thread):
+    # Holds one dedicated (unpooled) connection in LISTEN mode and calls
+    # `on_change` for every batch of notifications.
+
+    def __init__(self, on_change, channel=CHANNEL):
+        super().__init__(name="production-data-listener", daemon=True)
+        self.on_change = on_change
+        self.channel = channel
+        self.notifications = 0
+        self.connected = False
+        self._stopped = threading.Event()
+
+    def _listen(self):
+        connection = psycopg2.connect(**connection_settings())
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {self.channel};")
+        return connection
+
+    def run(self):
+        backoff = 1.0
+        while not self._stopped.is_set():
+            connection = None
+            try:
+                connection = self._listen()
+                self.connected = True
+                backoff = 1.0
+                # Anything written while we were disconnected
+                self.on_change()
+
+                while not self._stopped.is_set():
+                    if select.select([connection], [], [], POLL_TIMEOUT) == ([], [], []):
+                        continue
+                    connection.poll()
+                    if connection.notifies:
+                        self.notifications += len(connection.notifies)
+                        connection.notifies.clear()
+                        self.on_change()
+            except (OperationalError, InterfaceError) as e:
+                print(f"❌ Change listener error: {e}")
+                self.connected = False
+                self._stopped.wait(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF)
+            finally:
+                if connection is not None:
+                    connection.close()
+
+    def stop(self):
+        self._stopped.set()
+
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def start_change_listener(on_change):
+    global _listener
+    with _listener_lock:
+        if _listener is None or not _listener.is_alive():
+            _listener = ChangeListener(on_change)
+            _listener.start()
+        return _listener
@@ -0,0 +1,73 @@
+import os
+
+import pandas as pd
+
+# =============================
+# Settings
+# =============================
+# Hard cap on bars/points sent to the browser per chart
+MAX_CHART_POINTS = int(os.getenv("DASHBOARD_MAX_CHART_POINTS", "2000"))
+# Above this many points charts switch to WebGL (scattergl) traces
+WEBGL_POINTS = int(os.getenv("DASHBOARD_WEBGL_POINTS", "800"))
+
+# Shifts change over at 09:00 and 21:00
+SHIFT_START = pd.Timedelta(hours=9)
+SHIFT_LENGTH = "12h"
+
+# Finest first; buckets per day are used to estimate the point count
+RESOLUTIONS = {
+    "slot": 10,
+    "shift": 2,
+    "day": 1,
+    "week": 1 / 7,
+}
+
+
+# =============================
+# Bucketing
+# =============================
+def bucket_times(times, resolution):
+    # Vectorized floor of a datetime Series onto the resolution's grid
+    if resolution == "slot":
+        return times
+    if resolution == "shift":
+        return (times - SHIFT_START).dt.floor(SHIFT_LENGTH) + SHIFT_START
+    if resolution == "day":
+        return times.dt.floor("D")
+    if resolution == "week":
+        days = times.dt.floor("D")
+        return days - pd.to_timedelta(days.dt.weekday, unit="D")
+    raise ValueError(f"Unknown resolution: {resolution}")
+
+
+def choose_resolution(frame, time_column, series_column, max_points=MAX_CHART_POINTS):
+    # Finest resolution whose estimated point count fits under the cap
+    times = frame[time_column].dropna()
+    if times.empty:
+        return "slot"
+    days = (times.max() - times.min()) / pd.Timedelta(days=1) + 1
+    series = max(frame[series_column].nunique(), 1)
+    for resolution, per_day in RESOLUTIONS.items():
+        if days * per_day * series <= max_points:
+            return resolution
+    return "week"
+
+
+def downsample(frame, time_column, series_column, value_columns, max_points=MAX_CHART_POINTS):
+    # -> (frame summed per bucket and series, resolution used). Anything
+    # still over the cap keeps only the most recent buckets.
+    resolution = choose_resolution(frame, time_column, series_column, max_points)
+    buckets = frame.assign(**{time_column: bucket_times(frame[time_column], resolution)})
+    out = buckets.groupby(
+        [time_column, series_column], as_index=False, observed=True, sort=True
+    )[list(value_columns)].sum()
+
+    if len(out) > max_points:
+        series = max(out[series_column].nunique(), 1)
+        keep = out[time_column].drop_duplicates().nlargest(max(max_points // series, 1))
+        out = out[out[time_column] >= keep.min()]
+    return out, resolution
+
+
+def use_webgl(frame, threshold=WEBGL_POINTS):
+    return len(frame) > threshold
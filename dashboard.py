@@ -1,37 +1,18 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from streamlit_autorefresh import st_autorefresh
-from datetime import date 
-
-SUB_CATEGORY = {
-    "Die Bond": ["IC Bonding", "Pd/VC Bonding"],
-    "Machine Only": ["Wire Bonding", "Wire Checking", "Lens Bonding", "Lens CCD  Position Check"],
-    "Dispensing": ["Module Dispensing", "UV Curing dispense", "U Lens","Bake/Oven","Dispensing Reverse"],
-    "Function": ["Incoming Check", "Upload Program", "Divide Board", "Labeling", "BERT Test"],
-    "Packing": ["Check Connector", "Packing"] 
-}
-
-CUSTOM_ORDER = [
-    "Incoming Check",
-    "Module Dispensing",
-    "UV Curing dispense",
-    "IC Bonding",
-    "Pd/VC Bonding",
-    "Wire Bonding",
-    "Wire Checking",
-    "Lens Bonding",
-    "Lens CCD  Position Check",
-    "U Lens",
-    "Bake/Oven",
-    "Upload Program",
-    "Divide Board",
-    "Labeling",
-    "BERT Test",
-    "Dispensing Reverse",
-    "Check Connector",
-    "Packing"
-]
+import os
+from chart_buckets import downsample, use_webgl
+from admin_panel import metrics_sidebar
+from instrumentation import finish_run, start_run, timed
+from summary_table import summary_table
+from ingest_store import get_ingest_store
+from data_info import CUSTOM_ORDER, SUB_CATEGORY
+from record_schema import normalize_labels
+from hot_window import get_today_window, production_day
+from rollups import get_rollups
+import resources
+from sheet_sync import SOURCE
 
 CUSTOM_ORDER_TIME = [
     '10:00', '12:00', '15:00', '17:00',
@@ -40,7 +21,8 @@ CUSTOM_ORDER_TIME = [
 
 def bar_plot (df, x_axis, y_axis, color, title, CUSTOM_ORDER=None):
     if CUSTOM_ORDER and color in df.columns:
-        df[color] = pd.Categorical(df[color], categories=CUSTOM_ORDER, ordered=True)
+        # assign() leaves the caller's frame untouched
+        df = df.assign(**{color: pd.Categorical(df[color], categories=CUSTOM_ORDER, ordered=True)})
         df = df.sort_values(by=color)
         
 
@@ -83,6 +65,42 @@ def bar_plot (df, x_axis, y_axis, color, title, CUSTOM_ORDER=None):
     )
 
 
+    return fig
+
+def webgl_plot(df, x_axis, y_axis, color, title, CUSTOM_ORDER=None):
+    # Same chart as bar_plot drawn as WebGL lines, for point counts that
+    # SVG bars cannot render smoothly
+    fig = px.line(
+        df,
+        x=x_axis,
+        y=y_axis,
+        color=color,
+        markers=True,
+        render_mode="webgl",
+        title=title,
+        category_orders={color: CUSTOM_ORDER} if CUSTOM_ORDER else None,
+    )
+
+    fig.update_traces(
+        hovertemplate=(
+            "<b>Time:</b> %{x}"
+            "<br><b>OK:</b> %{y}"
+            "<extra></extra>"
+        ),
+    )
+
+    fig.update_layout(
+        legend=dict(
+            title="Station",
+            font=dict(size=25),
+            itemsizing="trace",
+            itemwidth=60,
+        ),
+        title_font=dict(size=18),
+        xaxis_title_font=dict(size=16),
+        yaxis_title_font=dict(size=16),
+    )
+
     return fig
 
 def scatter_plot(df, x_axis, y_axis, color, symbol, title):
@@ -159,23 +177,49 @@ def make_card(title, value, subtitle, color="#27AE60"):
 
 
 # ------------------------------
-# Auto-refresh every 30 seconds
-st_autorefresh(interval=30000, limit=None, key="refresh")
+# Local ingest store, kept in sync with the sheet by a background worker
+# region Reading add google sheet verificarion
+start_run("dashboard")
+with timed("dashboard.sync_worker"):
+    sync_worker = resources.sync_worker()
+    if SOURCE == "postgres":
+        resources.maintenance_worker()
+
+# Pre-aggregated OK/NG sums, folded forward as new rows arrive.
+# Shared by every session: filter them, never modify them in place.
+# Each level comes with inverted indexes; filters are index intersections.
+with timed("dashboard.rollups"):
+    rollups = get_rollups()
+    hourly_index = rollups.index("hourly")
+    daily_index = rollups.index("daily")
+weekly = rollups.weekly
+
+# The current production day in fixed NumPy arrays (type x batch x
+# station x slot); single-day views of today are answered from it.
+with timed("dashboard.today_window"):
+    today_window = get_today_window()
+
+# Built figures, keyed by chart, data version and filter selection, so
+# sessions viewing the same selection share one figure.
+figures = resources.figure_cache()
+
+
+def selected(value):
+    return None if value == "All" else value
+
 
 # ------------------------------
-# Google Sheets CSV URL (must be CSV export)
-# region Reading add google sheet verificarion
-SHEET_ID = "1oOJu04mdSgeGALFv9orv9LnvTf_HRBOlnLJVv4I07xc"
-GID = "190517020"
-CSV_URL = f"https://docs.google.com/spreadsheets/d/{SHEET_ID}/export?format=csv&gid={GID}"
+# Live updates: rerun only when the ingest store has new data.
+# The check is a version comparison, so idle screens cost next to nothing.
+POLL_SECONDS = float(os.getenv("DASHBOARD_POLL_SECONDS", "5"))
+st.session_state["data_version"] = rollups.version
 
-@st.cache_data(ttl=60)  # cache for 60 seconds
-def load_data():
-    df = pd.read_csv(CSV_URL)
-    return df
+@st.fragment(run_every=POLL_SECONDS)
+def watch_for_new_data():
+    if get_ingest_store().version != st.session_state.get("data_version"):
+        st.rerun()
 
-df = load_data()
-df["DateTime"] = pd.to_datetime(df["Date"].astype(str) + " " + df["Time"].astype(str), errors="coerce")
+watch_for_new_data()
 
 # endregion
 
@@ -196,159 +240,228 @@ st.markdown("""
 )
 
 # ------------------------------
-# Filter by TYPE
-# region filterring data
-st.markdown("---")  # horizontal line separator
+# Database-side aggregations
+# With the postgres source the summary charts ask Postgres for the small
+# GROUP BY answer; the rollups are the fallback (and the sheet path).
+DB_AGGREGATIONS = (
+    "ng_by_type_station",
+    "ok_by_slot_station",
+    "weekly_packing_totals",
+    "yield_by_station_day",
+)
 
-df['Date'] = pd.to_datetime(df['Date'], errors='coerce').dt.date
-unique_dates = sorted({d.isoformat() for d in df['Date'].dropna()})  # set -> unique
-categories_dates = ["All"] + unique_dates
-today_iso = pd.Timestamp.today().date().isoformat()
 
-default_index = 0
-try:
-    default_index = categories_dates.index(today_iso)
-except ValueError:
-    # today not present, default stays 0
-    default_index = 0
+@st.cache_data(max_entries=128)
+def db_aggregate(name, version, **params):
+    # `version` only keys the cache: a new sync means new rows.
+    # Imported here so the sheet source never loads psycopg2.
+    import database_connect
 
+    if name not in DB_AGGREGATIONS:
+        raise ValueError(f"Unknown aggregation: {name}")
+    with database_connect.get_connection() as conn:
+        if conn is None:
+            raise ConnectionError("database unavailable")
+        frame = getattr(database_connect, name)(conn, **params)
+    # Same station labels as the sheet path and CUSTOM_ORDER
+    if "Station" in frame.columns:
+        frame = frame.assign(Station=normalize_labels(frame["Station"]))
+    return frame
 
-df['Time'] = pd.Categorical(df['Time'], categories=CUSTOM_ORDER_TIME, ordered=True)
-df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-df['Batch'] = df['Batch'].astype(str).str.strip()
-df['Batch'] = df['Batch'].str.strip().str.lower().str.replace(' ', '')
-batchs_available = ["All"] + df['Batch'].unique().tolist()
 
-# # --- Debugging output (remove when working)
-# st.write("DEBUG: today_iso =", today_iso)
-# st.write("DEBUG: first 10 categories_dates =", categories_dates)
-# st.write("DEBUG: default_index computed =", default_index)
-filtered_df = df.copy()
+def from_database(name, **params):
+    if SOURCE != "postgres":
+        return None
+    try:
+        with timed(f"dashboard.db.{name}"):
+            return db_aggregate(name, rollups.version, **params)
+    except Exception as e:
+        print(f"❌ Aggregation query error ({name}): {e}")
+        return None
 
-col1, col2, col3, col4, col5, col6 = st.columns([1, 1, 1, 1, 1, 0.5])
 
-with col1:
-    st.markdown(
-        "<h4 style='color:#2C3E50; margin-top:24px;'>🔍 Select Category:</h4>",
-        unsafe_allow_html=True
-    )
+def as_list(value):
+    return None if value is None else [value]
 
-with col2:
-    categories_1 = ["All"] + sorted(df['TYPE'].dropna().unique().tolist())
-    selected_category_1 = st.selectbox(
-        "Type Module",
-        options=categories_1,
-        index=0,
-        key="category_filter_1"
-    )
+# ------------------------------
+# Filter by TYPE
+# region filterring data
+batchs_available = ["All"] + daily_index.select().unique('Batch')
 
-    if selected_category_1 != "All":
-        filtered_df = filtered_df[filtered_df['TYPE'] == selected_category_1]
 
-with col3:
-    selected_category_2 = st.date_input(
-        "Start Date",
-        value=date.today(),
-        key="category_filter_2"
-    )
+@st.cache_data(max_entries=64)
+def station_pivot(version, date_range, type_filter, batch_filter):
+    # Cached per data version and filter selection; the bar chart
+    # pills do not invalidate it.
+    if today_window.covers(date_range):
+        filtered_df = today_window.cells(TYPE=type_filter, Batch=batch_filter)
+    else:
+        filtered_df = from_database(
+            "ok_by_slot_station",
+            start=date_range[0],
+            end=date_range[1] + pd.Timedelta(days=1),
+            model_types=as_list(type_filter),
+            batch=batch_filter
+        )
+    if filtered_df is None:
+        filtered_df = hourly_index.select(
+            date_range=date_range,
+            TYPE=type_filter,
+            Batch=batch_filter
+        ).frame(["Time", "Station", "OK"])
+    # Stays numeric; thousands separators come from the column config
+    return summary_table(filtered_df, "Time", "Station", "OK", CUSTOM_ORDER_TIME, CUSTOM_ORDER)
+
+
+@st.fragment
+def production_section():
+    st.markdown("---")  # horizontal line separator
+
+    col1, col2, col3, col4, col5, col6 = st.columns([1, 1, 1, 1, 1, 0.5])
+
+    with col1:
+        st.markdown(
+            "<h4 style='color:#2C3E50; margin-top:24px;'>🔍 Select Category:</h4>",
+            unsafe_allow_html=True
+        )
 
-with col4:
-    selected_category_3 = st.date_input(
-        "End Date",
-        value=date.today(),
-        key="category_filter_3"
-    )
+    with col2:
+        categories_1 = ["All"] + sorted(hourly_index.postings['TYPE'])
+        selected_category_1 = st.selectbox(
+            "Type Module",
+            options=categories_1,
+            index=0,
+            key="category_filter_1"
+        )
 
-    # ✅ Apply date filtering (no "All" string check)
-    start_date = pd.to_datetime(selected_category_2)
-    end_date = pd.to_datetime(selected_category_3)
-    filtered_df = filtered_df[
-        (filtered_df['Date'] >= start_date) &
-        (filtered_df['Date'] <= end_date)
-    ]
-
-with col5:
-    batchs_available_data = ["All"] + filtered_df['Batch'].dropna().unique().tolist()
-    selected_category_4 = st.selectbox(
-        "Batch",
-        options=batchs_available_data,
-        index=0,
-        key="category_filter_4"
-    )
+    with col3:
+        selected_category_2 = st.date_input(
+            "Start Date",
+            value=production_day().date(),
+            key="category_filter_2"
+        )
 
-    if selected_category_4 != "All":
-        filtered_df = filtered_df[filtered_df['Batch'] == selected_category_4]
+    with col4:
+        selected_category_3 = st.date_input(
+            "End Date",
+            value=production_day().date(),
+            key="category_filter_3"
+        )
 
-with col6:
-    st.markdown(
-        f"""
-        <div style='
-            background-color:#eef6ff;
-            border-left:5px solid #0078ff;
-            padding:8px 14px;
-            border-radius:8px;
-            font-size:15px;
-            color:#2C3E50;
-            margin-top:28px;
-        '>
-            📦 Showing: <b>{selected_category_1}</b><br>
-            📅 From <b>{selected_category_2}</b> to <b>{selected_category_3}</b>
-        </div>
-        """,
-        unsafe_allow_html=True
-    )
+        # ✅ Apply date filtering (no "All" string check)
+        date_range = (pd.to_datetime(selected_category_2), pd.to_datetime(selected_category_3))
+        type_selection = hourly_index.select(
+            date_range=date_range,
+            TYPE=selected(selected_category_1)
+        )
 
+    with col5:
+        batchs_available_data = ["All"] + type_selection.unique('Batch')
+        selected_category_4 = st.selectbox(
+            "Batch",
+            options=batchs_available_data,
+            index=0,
+            key="category_filter_4"
+        )
 
+        filter_args = dict(
+            date_range=date_range,
+            TYPE=selected(selected_category_1),
+            Batch=selected(selected_category_4)
+        )
 
-# endregion
+    with col6:
+        st.markdown(
+            f"""
+            <div style='
+                background-color:#eef6ff;
+                border-left:5px solid #0078ff;
+                padding:8px 14px;
+                border-radius:8px;
+                font-size:15px;
+                color:#2C3E50;
+                margin-top:28px;
+            '>
+                📦 Showing: <b>{selected_category_1}</b><br>
+                📅 From <b>{selected_category_2}</b> to <b>{selected_category_3}</b>
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
 
-# ------------------------------
-# Create pivot table
-pivot_1 = filtered_df.pivot_table(
-    index='Time',
-    columns='Station',
-    values='OK',
-    aggfunc='sum',
-    fill_value=0, 
-)
-pivot_1 = pivot_1[[col for col in CUSTOM_ORDER if col in pivot_1.columns]]
-pivot_1['Total per Time'] = pivot_1.sum(axis=1)
-pivot_1.loc['Grand Total'] = pivot_1.sum(numeric_only=True)
-pivot_1 = pivot_1.applymap(lambda x: f"{x:,.0f}" if isinstance(x, (int, float)) else x)
 
 
+    # ------------------------------
+    # Create pivot table
+    with timed("dashboard.pivot"):
+        pivot_1 = station_pivot(
+            rollups.version,
+            date_range,
+            selected(selected_category_1),
+            selected(selected_category_4)
+        )
 
-# ------------------------------
-# Display DataFrame
-st.subheader("📋 Station Record Summary")
-st.dataframe(
-    pivot_1,
-    use_container_width=True,
-    hide_index=False
-)
 
-st.markdown("---")
+    # ------------------------------
+    # Display DataFrame
+    st.subheader("📋 Station Record Summary")
+    st.dataframe(
+        pivot_1,
+        use_container_width=True,
+        hide_index=False,
+        column_config={
+            column: st.column_config.NumberColumn(format="localized")
+            for column in pivot_1.columns
+        }
+    )
 
-# ------------------------------
-# Plotly bar chart
-st.subheader("🧰 Production Station Pcs")
-options = ["Die Bond", "Machine Only", "Dispensing", "Function","Packing", "All"]
+    st.markdown("---")
+
+    # ------------------------------
+    # Plotly bar chart
+    st.subheader("🧰 Production Station Pcs")
+    options = ["Die Bond", "Machine Only", "Dispensing", "Function","Packing", "All"]
 
-plot_df = filtered_df.copy()
-if hasattr(st, "pills"):
-    selection = st.pills("Station Categories", options, selection_mode="multi")
-else:
-    selection = st.multiselect("Station Categories", options, default=["All"])
-if "All" not in selection:
-    selected_subcats = []
-    for category in selection:
-        selected_subcats.extend(SUB_CATEGORY.get(category, []))
-    plot_df = plot_df[plot_df['Station'].isin(selected_subcats)]
+    station_filter = None
+    if hasattr(st, "pills"):
+        selection = st.pills("Station Categories", options, selection_mode="multi")
+    else:
+        selection = st.multiselect("Station Categories", options, default=["All"])
+    if "All" not in selection:
+        selected_subcats = []
+        for category in selection:
+            selected_subcats.extend(SUB_CATEGORY.get(category, []))
+        station_filter = selected_subcats
+
+    def build_station_bar():
+        if today_window.covers(date_range):
+            plot_df = today_window.cells(**filter_args, Station=station_filter)[["DateTime", "OK", "Station"]]
+        else:
+            plot_df = hourly_index.select(**filter_args, Station=station_filter).frame(["DateTime", "OK", "Station"])
+        # Long ranges are re-bucketed to shift/day/week to stay under the point cap
+        plot_df, resolution = downsample(plot_df, "DateTime", "Station", ["OK"])
+        title = "Output Production Daily" if resolution == "slot" else f"Output Production Daily (per {resolution})"
+        if use_webgl(plot_df):
+            return webgl_plot(plot_df, "DateTime", "OK", "Station", title, CUSTOM_ORDER)
+        return bar_plot(plot_df,"DateTime","OK","Station",title,  CUSTOM_ORDER)
+
+    bar_key = (
+        "station_bar",
+        rollups.version,
+        date_range,
+        filter_args["TYPE"],
+        filter_args["Batch"],
+        tuple(station_filter) if station_filter is not None else None,
+    )
 
+    # st.markdown(f"Your selected options: {selection}.")
+    station_bar = figures.get(bar_key, build_station_bar)
+    with timed("dashboard.render.station_bar"):
+        st.plotly_chart(station_bar)
 
+production_section()
 
-# st.markdown(f"Your selected options: {selection}.")
-st.plotly_chart(bar_plot(plot_df,"DateTime","OK","Station","Output Production Daily",  CUSTOM_ORDER))
+# endregion
 
 st.markdown("---")
 
@@ -359,7 +472,8 @@ col1, col2 = st.columns(2)
 # ==========================
 #  SELECT BATCH (LEFT)
 # ==========================
-with col1:
+@st.fragment
+def top_ng_section():
     # Header with padding
     st.markdown(
         """
@@ -386,28 +500,29 @@ with col1:
     )
 
     # Top 5 NG Chart
-    df_NG = df.copy()
+    def build_top_ng():
+        df_NG = from_database("ng_by_type_station", batch=selected(selected_batch))
+        if df_NG is None:
+            df_NG = daily_index.select(Batch=selected(selected_batch)).frame(["TYPE", "Station", "NG"])
 
-    if selected_batch != "All":
-        df_NG = df_NG[df_NG["Batch"] == selected_batch]
+        group_1 = df_NG.groupby(['TYPE', 'Station'], as_index=False, observed=True)['NG'].sum()
+        top5_NG = group_1.nlargest(5, 'NG')
+        return scatter_plot(top5_NG, "Station", "NG", "Station","TYPE", "🚨 Top 5 NG Line")
+
+    top_ng = figures.get(("top_ng", rollups.version, selected(selected_batch)), build_top_ng)
+    with timed("dashboard.render.top_ng"):
+        st.plotly_chart(top_ng, use_container_width=True)
+
+
+with col1:
+    top_ng_section()
 
-    group_1 = df_NG.groupby(['TYPE', 'Station'], as_index=False)['NG'].sum()
-    top5_NG = group_1.nlargest(5, 'NG')
-    st.plotly_chart(
-        scatter_plot(top5_NG, "Station", "NG", "Station","TYPE", "🚨 Top 5 NG Line"),
-        use_container_width=True
-    )
-   
 
 # ==========================
 # SELECT WEEK (RIGHT)
 # ==========================
-with col2:
-    # Ensure datetime conversion
-    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-    df['ISO_Year'] = df['Date'].dt.isocalendar().year
-    df['ISO_Week'] = df['Date'].dt.isocalendar().week
-
+@st.fragment
+def weekly_packing_section():
     today = pd.Timestamp.today()
     current_week = today.isocalendar().week
     current_year = today.year
@@ -428,8 +543,7 @@ with col2:
     )
 
     # Week selector
-    df['ISO_Week'] = df['ISO_Week'].astype('Int64')
-    weeks_available = sorted(df['ISO_Week'].dropna().astype(int).unique().tolist())
+    weeks_available = sorted(weekly['ISO_Week'].dropna().astype(int).unique().tolist())
 
     if current_week in weeks_available:
         default_index = weeks_available.index(current_week)
@@ -444,13 +558,18 @@ with col2:
     )
 
     # Filter & plot
-    filteredout_df = df[
-        (df['ISO_Week'] == selected_week) &
-        (df['ISO_Year'] == current_year)
-    ].copy()
-
-    station_df = filteredout_df[filteredout_df['Station'] == 'Packing']
-    group_out = station_df.groupby('Date', as_index=False)['OK'].sum()
+    group_out = from_database(
+        "weekly_packing_totals",
+        iso_year=current_year,
+        iso_week=selected_week
+    )
+    if group_out is None:
+        station_df = daily_index.select(
+            ISO_Week=selected_week,
+            ISO_Year=current_year,
+            Station='Packing'
+        ).frame(["Date", "OK"])
+        group_out = station_df.groupby('Date', as_index=False)['OK'].sum()
 
     fig = px.bar(
         group_out,
@@ -494,7 +613,11 @@ with col2:
     st.plotly_chart(fig, use_container_width=True)
 
 
-# col1, col2, col3, col4 = st.columns(4)
+
+with col2:
+    weekly_packing_section()
+
+
 # with col1:
 #     make_card("📦 Output", "12,480", "Units Today", "#27AE60")
 # with col2:
@@ -508,115 +631,127 @@ with col2:
 
 st.subheader("🔄 Batch Analyze Flow ")
 
-col1, col2 = st.columns([1,2])
-
-with col1:
-
-    # Batch selector
-    batchs_available_process = ["All"] + df['Batch'].unique().tolist()
-
-    col11, col12 = st.columns(2)
-
-    with col11:
-        st.markdown("<div style='margin-top: 20px;'></div>", unsafe_allow_html=True)
-        selected_batch_process = st.selectbox(
-            "",
-            index = len(batchs_available_process) - 1,
-            options=batchs_available_process,
-            key="batch_select_process",
-            label_visibility="collapsed"
-        )
-
-    with col12:
-        st.markdown("<div style='padding-top: 10px;'></div>", unsafe_allow_html=True)
-        model_type = st.radio(
-            "",
-            options=["TX","RX"],
-            horizontal=True,
-            label_visibility="collapsed"
-        )
+@st.fragment
+def batch_flow_section():
+    col1, col2 = st.columns([1,2])
+
+    with col1:
+
+        # Batch selector
+        batchs_available_process = batchs_available
+
+        col11, col12 = st.columns(2)
+
+        with col11:
+            st.markdown("<div style='margin-top: 20px;'></div>", unsafe_allow_html=True)
+            selected_batch_process = st.selectbox(
+                "",
+                index = len(batchs_available_process) - 1,
+                options=batchs_available_process,
+                key="batch_select_process",
+                label_visibility="collapsed"
+            )
+
+        with col12:
+            st.markdown("<div style='padding-top: 10px;'></div>", unsafe_allow_html=True)
+            model_type = st.radio(
+                "",
+                options=["TX","RX"],
+                horizontal=True,
+                label_visibility="collapsed"
+            )
     
 
     
     
-    batch_df = df.copy()
+        batch_df = from_database(
+            "yield_by_station_day",
+            model_types=[model_type],
+            batch=selected(selected_batch_process)
+        )
+        if batch_df is not None:
+            batch_df = batch_df[["Station", "OK", "NG"]].assign(Batch=selected_batch_process)
+        else:
+            batch_df = daily_index.select(
+                Batch=selected(selected_batch_process),
+                TYPE=model_type
+            ).frame(["Batch", "Station", "OK", "NG"])
+    
+        pie_df = batch_df.melt(
+        id_vars=["Batch"],
+        value_vars=["OK", "NG"],
+        var_name="Category",
+        value_name="Value"
+        )
 
-    if selected_batch_process != "All":
-        batch_df = batch_df[batch_df["Batch"] == selected_batch_process]
+        pie_df = pie_df.groupby("Category", as_index=False)["Value"].sum()
+        pie_df["Category"] = pie_df["Category"].str.strip().str.upper()
 
-    else:
-        batch_df = batch_df
 
-    batch_df = batch_df[batch_df['TYPE'] == model_type]
-    
-    pie_df = batch_df.melt(
-    id_vars=["Batch"],
-    value_vars=["OK", "NG"],
-    var_name="Category",
-    value_name="Value"
+        fig = px.pie(
+        pie_df,
+        names="Category",
+        values="Value",
+        color="Category",
+        color_discrete_map={"OK": "#2E8B57", "NG": "#D9534F"},
+        hole=0.6
     )
 
-    pie_df = pie_df.groupby("Category", as_index=False)["Value"].sum()
-    pie_df["Category"] = pie_df["Category"].str.strip().str.upper()
+        # --- Add selected batch name in the center ---
+        fig.add_annotation(
+            text=selected_batch_process,
+            x=0.5, y=0.5,
+            font=dict(size=30, color="#333", family="Arial Black"),
+            showarrow=False
+        )
 
+        # --- Display in Streamlit ---
+        st.plotly_chart(fig, use_container_width=True)
 
-    fig = px.pie(
-    pie_df,
-    names="Category",
-    values="Value",
-    color="Category",
-    color_discrete_map={"OK": "#2E8B57", "NG": "#D9534F"},
-    hole=0.6
-)
 
-    # --- Add selected batch name in the center ---
-    fig.add_annotation(
-        text=selected_batch_process,
-        x=0.5, y=0.5,
-        font=dict(size=30, color="#333", family="Arial Black"),
-        showarrow=False
-    )
+    with col2:
+        filtered_2_df = batch_df
+        filtered_2_df[["OK", "NG"]] = filtered_2_df[["OK", "NG"]].fillna(0)
 
-    # --- Display in Streamlit ---
-    st.plotly_chart(fig, use_container_width=True)
+        df_group_1 = (
+            filtered_2_df
+            .groupby("Station", observed=True)[["OK", "NG"]]
+            .sum()
+            .reset_index() 
+        )
+    
+        df_melted = df_group_1.melt(id_vars="Station", value_vars=["OK", "NG"], var_name="Status", value_name="Count")
+
+    # Plot stacked bar chart
+        fig = px.bar(
+        df_melted,
+        x="Station",
+        y="Count",
+        color="Status",
+        text="Count",
+        title="📊 Production Result by Station",
+        color_discrete_map={
+            "OK": "#2E8B57",   # sea green
+            "NG": "#D9534F"    # soft red
+        },
+        category_orders={"Station": CUSTOM_ORDER}
+        )
+        fig.update_yaxes(range=[0, df_melted["Count"].max() * 1.4])
 
+    # Make bars stacked
+        fig.update_layout(barmode="stack")
+
+    # Display in Streamlit
+        st.plotly_chart(fig, use_container_width=True)
 
-with col2:
-    filtered_2_df = batch_df.copy()
-    filtered_2_df[["OK", "NG"]] = filtered_2_df[["OK", "NG"]].fillna(0)
-
-    df_group_1 = (
-        filtered_2_df
-        .groupby("Station")[["OK", "NG"]]
-        .sum()
-        .reset_index() 
-    )
-    
-    df_melted = df_group_1.melt(id_vars="Station", value_vars=["OK", "NG"], var_name="Status", value_name="Count")
 
-# Plot stacked bar chart
-    fig = px.bar(
-    df_melted,
-    x="Station",
-    y="Count",
-    color="Status",
-    text="Count",
-    title="📊 Production Result by Station",
-    color_discrete_map={
-        "OK": "#2E8B57",   # sea green
-        "NG": "#D9534F"    # soft red
-    },
-    category_orders={"Station": CUSTOM_ORDER}
-    )
-    fig.update_yaxes(range=[0, df_melted["Count"].max() * 1.4])
 
-# Make bars stacked
-    fig.update_layout(barmode="stack")
 
-# Display in Streamlit
-    st.plotly_chart(fig, use_container_width=True)
 
 
 
 
+batch_flow_section()
 
+finish_run()
+metrics_sidebar()
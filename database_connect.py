@@ -1,5 +1,18 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from itertools import islice
+
+import pandas as pd
 import psycopg2
-from psycopg2 import OperationalError
+from psycopg2 import OperationalError, InterfaceError
+from psycopg2 import pool as pg_pool
+from psycopg2.extensions import cursor as pg_cursor
+from psycopg2.extras import execute_values
+
+from instrumentation import record_query, timed
 
 # =============================
 # SQL: Create Table
@@ -21,6 +34,59 @@ CREATE TABLE IF NOT EXISTS production_data (
 );
 """
 
+# Inserts, updates and deletes are logged so readers can sync
+# incrementally from the change_id watermark.
+CREATE_CHANGE_LOG_QUERY = """
+CREATE TABLE IF NOT EXISTS production_data_changes (
+    change_id BIGSERIAL PRIMARY KEY,
+    record_id INTEGER,
+    operation CHAR(1) NOT NULL,
+    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE OR REPLACE FUNCTION log_production_data_change() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO production_data_changes (record_id, operation)
+        VALUES (OLD.id, 'D');
+        RETURN OLD;
+    END IF;
+    INSERT INTO production_data_changes (record_id, operation)
+    VALUES (NEW.id, CASE WHEN TG_OP = 'INSERT' THEN 'I' ELSE 'U' END);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_trigger WHERE tgname = 'production_data_change_log'
+    ) THEN
+        CREATE TRIGGER production_data_change_log
+        AFTER INSERT OR UPDATE OR DELETE ON production_data
+        FOR EACH ROW EXECUTE FUNCTION log_production_data_change();
+    END IF;
+END;
+$$;
+"""
+
+# Maps production_date onto the hourly-record time slot labels used by
+# the line sheet (slot = latest slot start at or before the hour).
+TIME_SLOT_SQL = """
+CASE
+    WHEN EXTRACT(HOUR FROM production_date) >= 22 THEN '22:00'
+    WHEN EXTRACT(HOUR FROM production_date) >= 20 THEN '20:00'
+    WHEN EXTRACT(HOUR FROM production_date) >= 17 THEN '17:00'
+    WHEN EXTRACT(HOUR FROM production_date) >= 15 THEN '15:00'
+    WHEN EXTRACT(HOUR FROM production_date) >= 12 THEN '12:00'
+    WHEN EXTRACT(HOUR FROM production_date) >= 10 THEN '10:00'
+    WHEN EXTRACT(HOUR FROM production_date) >= 8 THEN '8:00'
+    WHEN EXTRACT(HOUR FROM production_date) >= 5 THEN '5:00'
+    WHEN EXTRACT(HOUR FROM production_date) >= 3 THEN '3:00'
+    ELSE '0:00'
+END
+"""
+
 # =============================
 # Connection
 # =============================
@@ -37,9 +103,176 @@ def create_connection(db_name, db_user, db_password, db_host, db_port):
         print(f"❌ Database connection error: {e}")
         return None
 
+# =============================
+# Timed Cursor
+# Every pooled query is recorded with its duration and row count.
+# =============================
+class TimedCursor(pg_cursor):
+    def execute(self, query, params=None):
+        started = time.perf_counter()
+        try:
+            return super().execute(query, params)
+        finally:
+            record_query(query, time.perf_counter() - started, self.rowcount)
+
+    def executemany(self, query, params_seq):
+        started = time.perf_counter()
+        try:
+            return super().executemany(query, params_seq)
+        finally:
+            record_query(query, time.perf_counter() - started, self.rowcount)
+
+# =============================
+# Connection Pool
+# =============================
+POOL_MIN_CONN = int(os.getenv("DB_POOL_MIN", "1"))
+POOL_MAX_CONN = int(os.getenv("DB_POOL_MAX", "20"))
+
+_pool = None
+_pool_lock = threading.Lock()
+_pool_stats = {
+    "checkouts": 0,
+    "checkins": 0,
+    "reconnects": 0,
+    "failed_health_checks": 0,
+    "exhausted": 0,
+}
+_stats_lock = threading.Lock()
+
+
+def _bump(stat):
+    with _stats_lock:
+        _pool_stats[stat] += 1
+
+
+def connection_settings():
+    from dotenv import load_dotenv
+    load_dotenv()
+    return {
+        "database": os.getenv("DB_NAME", "mydb"),
+        "user": os.getenv("DB_USER", "postgres"),
+        "password": os.getenv("DB_PASSWORD", "123"),
+        "host": os.getenv("DB_HOST", "localhost"),
+        "port": os.getenv("DB_PORT", "5432"),
+    }
+
+
+def init_connection_pool(minconn=POOL_MIN_CONN, maxconn=POOL_MAX_CONN):
+    global _pool
+    with _pool_lock:
+        if _pool is not None and not _pool.closed:
+            return _pool
+        try:
+            _pool = pg_pool.ThreadedConnectionPool(
+                minconn,
+                maxconn,
+                cursor_factory=TimedCursor,
+                **connection_settings()
+            )
+        except OperationalError as e:
+            print(f"❌ Database pool error: {e}")
+            _pool = None
+        return _pool
+
+
+def get_pool():
+    if _pool is None or _pool.closed:
+        return init_connection_pool()
+    return _pool
+
+
+def close_connection_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None and not _pool.closed:
+            _pool.closeall()
+        _pool = None
+
+
+def is_connection_healthy(connection):
+    if connection is None or connection.closed:
+        return False
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1;")
+        connection.rollback()
+        return True
+    except (OperationalError, InterfaceError):
+        return False
+
+
+def _checkout(pool):
+    connection = pool.getconn()
+    _bump("checkouts")
+    if is_connection_healthy(connection):
+        return connection
+
+    # Server restarted or the socket dropped: throw the dead connection
+    # away and let the pool open a fresh one in its slot.
+    _bump("failed_health_checks")
+    pool.putconn(connection, close=True)
+    connection = pool.getconn()
+    _bump("reconnects")
+    return connection
+
+
+def _checkin(pool, connection):
+    _bump("checkins")
+    if connection.closed:
+        pool.putconn(connection, close=True)
+        return
+    try:
+        # Never hand an open transaction back to the pool
+        connection.rollback()
+        pool.putconn(connection)
+    except (OperationalError, InterfaceError):
+        pool.putconn(connection, close=True)
+
+
+@contextmanager
+def get_connection():
+    pool = get_pool()
+    if pool is None:
+        yield None
+        return
+
+    try:
+        connection = _checkout(pool)
+    except (pg_pool.PoolError, OperationalError) as e:
+        _bump("exhausted")
+        print(f"❌ Database pool checkout error: {e}")
+        yield None
+        return
+
+    try:
+        yield connection
+    finally:
+        _checkin(pool, connection)
+
+
+def pool_stats():
+    pool = _pool
+    with _stats_lock:
+        stats = dict(_pool_stats)
+    if pool is None or pool.closed:
+        stats.update({"min": 0, "max": 0, "open": 0, "in_use": 0, "idle": 0})
+        return stats
+
+    in_use = len(pool._used)
+    idle = len(pool._pool)
+    stats.update({
+        "min": pool.minconn,
+        "max": pool.maxconn,
+        "open": in_use + idle,
+        "in_use": in_use,
+        "idle": idle,
+    })
+    return stats
+
 # =============================
 # Execute Generic Query
 # =============================
+@timed("db.execute_query")
 def execute_query(connection, query, params=None):
     try:
         with connection.cursor() as cursor:
@@ -54,9 +287,18 @@ def execute_query(connection, query, params=None):
 # =============================
 def create_production_table(connection):
     execute_query(connection, CREATE_TABLE_QUERY)
+    execute_query(connection, CREATE_CHANGE_LOG_QUERY)
 
 def drop_production_table(connection):
+    # Imported here: migrations imports this module
+    from migrations import reset_initialization
+
     execute_query(connection, "DROP TABLE IF EXISTS production_data;")
+    execute_query(connection, "DROP TABLE IF EXISTS production_data_changes;")
+    # The migrations were applied to the dropped table; forget them so
+    # they run again on the recreated one
+    execute_query(connection, "DROP TABLE IF EXISTS schema_migrations;")
+    reset_initialization()
 
 def clear_production_table(connection):
     execute_query(connection, "DELETE FROM production_data;")
@@ -96,6 +338,78 @@ def insert_production_record(connection, data):
 
     execute_query(connection, insert_query, values)
 
+BULK_INSERT_QUERY = """
+INSERT INTO production_data (
+    station_name,
+    model_type,
+    batch_number,
+    tray_number,
+    product_line,
+    supplier_name,
+    ok_quantity,
+    ng_quantity,
+    operator_name,
+    remarks,
+    production_date,
+    submission_id
+)
+VALUES %s
+ON CONFLICT DO NOTHING;
+"""
+
+# Back-dated rows carry a "Date"; anything else gets the insert time.
+# Queued rows carry a "Submission ID", so a retried insert is skipped.
+BULK_INSERT_TEMPLATE = (
+    "(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, "
+    "COALESCE(%s::timestamp, CURRENT_TIMESTAMP), %s::uuid)"
+)
+
+def insert_production_records(connection, records, chunk_size=1000):
+    # One transaction for the whole batch; `records` may be any iterable
+    # of the same dicts insert_production_record takes.
+    rows = (
+        (
+            data["Station Name"],
+            data["Model Type"],
+            data["Batch Number"],
+            data["Tray Number"],
+            data["Product Line"],
+            data["Supplier"],
+            data["OK Quantity"],
+            data["NG Quantity"],
+            data["Operator Name"],
+            data.get("Remarks"),
+            data.get("Date"),
+            data.get("Submission ID")
+        )
+        for data in records
+    )
+
+    inserted = 0
+    try:
+        with connection.cursor() as cursor:
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+                execute_values(
+                    cursor,
+                    BULK_INSERT_QUERY,
+                    chunk,
+                    template=BULK_INSERT_TEMPLATE,
+                    page_size=chunk_size
+                )
+                # Rows skipped as duplicates are not counted
+                inserted += cursor.rowcount
+        connection.commit()
+    except Exception as e:
+        # Includes bad rows raised while consuming `records`
+        print(f"❌ Bulk insert error: {e}")
+        connection.rollback()
+        raise
+
+    return inserted
+
 def update_production_record(connection, record_id, updated_fields):
     set_clause = ", ".join([f"{k} = %s" for k in updated_fields.keys()])
     values = list(updated_fields.values()) + [record_id]
@@ -112,22 +426,111 @@ def delete_production_record(connection, record_id):
     delete_query = "DELETE FROM production_data WHERE id = %s;"
     execute_query(connection, delete_query, (record_id,))
 
-from dotenv import load_dotenv  
-import os
 # =============================
-# INITIALIZE CONNECTION
+# Aggregations
+# Small GROUP BY answers computed in Postgres; columns use the sheet
+# names (Date, Time, Station, TYPE, OK, NG) the dashboard works with.
+# =============================
+def _aggregate_where(start=None, end=None, stations=None, model_types=None, batch=None, product_lines=None):
+    # start inclusive, end exclusive; list filters match any value
+    clauses, params = [], []
+    if start is not None:
+        clauses.append("production_date >= %s")
+        params.append(start)
+    if end is not None:
+        clauses.append("production_date < %s")
+        params.append(end)
+    if stations:
+        clauses.append("station_name = ANY(%s)")
+        params.append(list(stations))
+    if model_types:
+        clauses.append("model_type = ANY(%s)")
+        params.append(list(model_types))
+    if batch is not None:
+        clauses.append("batch_number = %s")
+        params.append(int(batch))
+    if product_lines:
+        clauses.append("product_line = ANY(%s)")
+        params.append(list(product_lines))
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return where, params
 
-load_dotenv()
 
-conn = create_connection(
-    os.getenv("DB_NAME"),   
-    os.getenv("DB_USER"),   
-    os.getenv("DB_PASSWORD"),
-    os.getenv("DB_HOST"),   
-    os.getenv("DB_PORT")
-)
-# drop_production_table(conn)
-# create_production_table(conn)
+def _aggregate(connection, query, params):
+    return pd.read_sql(query, connection, params=params)
+
+
+def yield_by_station_day(connection, start=None, end=None, stations=None, model_types=None, batch=None,
+                         product_lines=None):
+    where, params = _aggregate_where(start, end, stations, model_types, batch, product_lines)
+    query = f"""
+    SELECT
+        production_date::date AS "Date",
+        station_name AS "Station",
+        SUM(ok_quantity) AS "OK",
+        SUM(ng_quantity) AS "NG",
+        SUM(ok_quantity)::float / NULLIF(SUM(ok_quantity) + SUM(ng_quantity), 0) AS "Yield"
+    FROM production_data
+    {where}
+    GROUP BY 1, 2
+    ORDER BY 1, 2;
+    """
+    return _aggregate(connection, query, params)
+
+
+def ng_by_type_station(connection, batch=None, start=None, end=None):
+    where, params = _aggregate_where(start, end, batch=batch)
+    query = f"""
+    SELECT
+        model_type AS "TYPE",
+        station_name AS "Station",
+        SUM(ng_quantity) AS "NG"
+    FROM production_data
+    {where}
+    GROUP BY 1, 2
+    ORDER BY 3 DESC;
+    """
+    return _aggregate(connection, query, params)
+
+
+def ok_by_slot_station(connection, start=None, end=None, model_types=None, batch=None):
+    where, params = _aggregate_where(start, end, model_types=model_types, batch=batch)
+    query = f"""
+    SELECT
+        {TIME_SLOT_SQL} AS "Time",
+        station_name AS "Station",
+        SUM(ok_quantity) AS "OK"
+    FROM production_data
+    {where}
+    GROUP BY 1, 2;
+    """
+    return _aggregate(connection, query, params)
+
+
+def weekly_packing_totals(connection, iso_year, iso_week, station="Packing"):
+    # ISO week bounds are computed here so the date index can be used
+    start = date.fromisocalendar(int(iso_year), int(iso_week), 1)
+    end = start + timedelta(days=7)
+    where, params = _aggregate_where(start, end, stations=[station])
+    query = f"""
+    SELECT
+        production_date::date AS "Date",
+        SUM(ok_quantity) AS "OK"
+    FROM production_data
+    {where}
+    GROUP BY 1
+    ORDER BY 1;
+    """
+    return _aggregate(connection, query, params)
+
+# =============================
+# INITIALIZE CONNECTION
+# The pool is opened lazily by the first get_connection() call,
+# so importing this module never touches the database.
+
+# with get_connection() as conn:
+#     drop_production_table(conn)
+#     create_production_table(conn)
 
 
 # if conn:
@@ -0,0 +1,114 @@
+import os
+import threading
+import time
+
+from psycopg2 import DatabaseError
+
+from database_connect import get_connection
+from instrumentation import timed
+from partitioning import PARTITION_INTERVAL, default_partition_rows, maintain_partitions, table_kind
+
+# =============================
+# Settings
+# =============================
+MAINTENANCE_INTERVAL = float(os.getenv("DB_MAINTENANCE_INTERVAL", "3600"))
+# Change log entries older than this are deleted; an incremental reader
+# that fell further behind notices the gap and reloads in full.
+CHANGE_LOG_RETENTION_HOURS = float(os.getenv("DASHBOARD_CHANGE_LOG_RETENTION_HOURS", "168"))
+
+PRUNE_CHANGES_QUERY = """
+DELETE FROM production_data_changes
+WHERE changed_at < CURRENT_TIMESTAMP - %s * INTERVAL '1 hour';
+"""
+
+
+# =============================
+# Tasks
+# =============================
+def prune_change_log(connection, retention_hours=CHANGE_LOG_RETENTION_HOURS):
+    # -> rows deleted
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(PRUNE_CHANGES_QUERY, (retention_hours,))
+            deleted = cursor.rowcount
+        connection.commit()
+    except DatabaseError as e:
+        print(f"❌ Change log prune error: {e}")
+        connection.rollback()
+        return 0
+    return deleted
+
+
+# =============================
+# Maintenance Worker
+# =============================
+class MaintenanceWorker(threading.Thread):
+    # Periodic housekeeping for a long-running server process; runs once
+    # at start and then every MAINTENANCE_INTERVAL seconds. Keeps future
+    # partitions created (a process can outlive PARTITIONS_AHEAD) and
+    # retention applied, and prunes the change log.
+
+    def __init__(self, interval=MAINTENANCE_INTERVAL):
+        super().__init__(name="db-maintenance", daemon=True)
+        self.interval = interval
+        self._stopped = threading.Event()
+        self.status = {
+            "runs": 0,
+            "last_run": None,
+            "changes_pruned": 0,
+            "partitions_created": [],
+            "partitions_retired": [],
+            "default_partition_rows": 0,
+            "last_error": None,
+        }
+
+    def run_once(self):
+        with timed("maintenance.run"), get_connection() as conn:
+            if conn is None:
+                self.status["last_error"] = "database unavailable"
+                return
+            if PARTITION_INTERVAL and table_kind(conn) == "p":
+                self._maintain_partitions(conn)
+            self.status["changes_pruned"] += prune_change_log(conn)
+
+        self.status["runs"] += 1
+        self.status["last_run"] = time.time()
+        self.status["last_error"] = None
+
+    def _maintain_partitions(self, conn):
+        created, retired = maintain_partitions(conn)
+        self.status["partitions_created"] = created
+        self.status["partitions_retired"] = retired
+
+        rows = default_partition_rows(conn)
+        self.status["default_partition_rows"] = rows
+        if rows:
+            print(
+                f"❌ {rows:,} rows in production_data_default: move them into a "
+                f"range partition, or they block creating it and escape retention"
+            )
+
+    def run(self):
+        while not self._stopped.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"❌ Database maintenance error: {e}")
+                self.status["last_error"] = str(e)
+            self._stopped.wait(self.interval)
+
+    def stop(self):
+        self._stopped.set()
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def start_maintenance_worker():
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = MaintenanceWorker()
+            _worker.start()
+        return _worker
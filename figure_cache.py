@@ -0,0 +1,105 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from instrumentation import count, timed
+
+# =============================
+# Settings
+# =============================
+FIGURE_CACHE_ENTRIES = int(os.getenv("DASHBOARD_FIGURE_CACHE_ENTRIES", "256"))
+FIGURE_CACHE_MB = float(os.getenv("DASHBOARD_FIGURE_CACHE_MB", "64"))
+
+# Layout, config and trace styling on top of the data arrays
+FIGURE_OVERHEAD_BYTES = 16 * 1024
+TRACE_ARRAYS = ("x", "y", "z", "text", "customdata", "labels", "values")
+
+
+def figure_bytes(figure):
+    # Approximate size from the trace arrays, which are the bulk of a
+    # figure, without serialising it just to measure it
+    size = FIGURE_OVERHEAD_BYTES
+    for trace in figure.data:
+        for name in TRACE_ARRAYS:
+            value = getattr(trace, name, None)
+            if value is not None:
+                size += np.asarray(value).nbytes
+    return size
+
+
+# =============================
+# Figure Cache
+# =============================
+class FigureCache:
+    # LRU of finished Plotly figures shared by every session. Keys carry the
+    # data version, so a new version simply stops hitting old entries and
+    # they age out. Figures are kept as objects, since st.plotly_chart
+    # serialises whatever it is given (a dict would be re-validated into
+    # a Figure first); entries are sized from their data arrays.
+
+    def __init__(self, max_entries=FIGURE_CACHE_ENTRIES, max_bytes=int(FIGURE_CACHE_MB * 1024 * 1024)):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        # key: (chart kind, data version, *filter selection); all hashable
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                count("figure_cache.hit")
+                return entry[0]
+            self.misses += 1
+        count("figure_cache.miss")
+
+        # Build outside the lock; two sessions racing on the same key just
+        # build it twice.
+        with timed(f"figure.build.{key[0]}"):
+            figure = build()
+        size = figure_bytes(figure)
+
+        with self._lock:
+            if key not in self._entries and size <= self.max_bytes:
+                self._entries[key] = (figure, size)
+                self.bytes += size
+                self._evict()
+        return figure
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self.bytes > self.max_bytes):
+            _, (_, size) = self._entries.popitem(last=False)
+            self.bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_figures = None
+_figures_lock = threading.Lock()
+
+
+def get_figure_cache():
+    global _figures
+    with _figures_lock:
+        if _figures is None:
+            _figures = FigureCache()
+        return _figures
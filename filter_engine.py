@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+# =============================
+# Selection
+# =============================
+class Selection:
+    # Row positions into a shared frame. Nothing is copied until a chart
+    # asks for the columns it needs.
+
+    def __init__(self, frame, positions):
+        self.source = frame
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def frame(self, columns=None):
+        source = self.source if columns is None else self.source[list(columns)]
+        return source.take(self.positions)
+
+    def unique(self, column):
+        return self.source[column].take(self.positions).dropna().unique().tolist()
+
+
+# =============================
+# Inverted Indexes
+# =============================
+class FilterIndex:
+    # Per-value sorted row-position arrays for the equality columns and a
+    # sorted date index for ranges; selections are array intersections.
+
+    def __init__(self, frame, columns=("TYPE", "Batch", "Station"), date_column="Date"):
+        self.frame = frame
+        self.postings = {column: self._postings(frame[column]) for column in columns}
+
+        self._date_order = self._sorted_dates = None
+        if date_column is not None:
+            dates = frame[date_column].to_numpy(dtype="datetime64[ns]")
+            self._date_order = np.argsort(dates, kind="stable")
+            self._sorted_dates = dates[self._date_order]
+
+    @staticmethod
+    def _postings(series):
+        codes, uniques = pd.factorize(series, sort=False)
+        order = np.argsort(codes, kind="stable")  # positions ascending per code
+        sorted_codes = codes[order]
+        splits = np.flatnonzero(np.diff(sorted_codes)) + 1
+        groups = np.split(order, splits)
+        postings = {}
+        for group in groups:
+            code = codes[group[0]] if len(group) else -1
+            if code >= 0:
+                postings[uniques[code]] = group
+        return postings
+
+    def _lookup(self, column, value):
+        postings = self.postings[column]
+        if isinstance(value, (list, tuple, set)):
+            arrays = [postings[v] for v in value if v in postings]
+            return np.sort(np.concatenate(arrays)) if arrays else np.empty(0, dtype=np.intp)
+        return postings.get(value, np.empty(0, dtype=np.intp))
+
+    def _date_range(self, start, end):
+        lo = 0 if start is None else np.searchsorted(self._sorted_dates, np.datetime64(start, "ns"), "left")
+        hi = len(self._sorted_dates) if end is None else np.searchsorted(self._sorted_dates, np.datetime64(end, "ns"), "right")
+        return np.sort(self._date_order[lo:hi])
+
+    def select(self, date_range=None, **equals):
+        # equals: column=value or column=[values]; None means no filter
+        positions = None
+        if date_range is not None:
+            positions = self._date_range(*date_range)
+
+        for column, value in equals.items():
+            if value is None:
+                continue
+            matched = self._lookup(column, value)
+            positions = matched if positions is None else np.intersect1d(positions, matched, assume_unique=True)
+
+        if positions is None:
+            positions = np.arange(len(self.frame))
+        return Selection(self.frame, positions)
@@ -0,0 +1,102 @@
+import json
+import os
+import threading
+import time
+
+import pyarrow as pa
+
+# =============================
+# Settings
+# =============================
+SNAPSHOT_DIR = os.getenv("DASHBOARD_SNAPSHOT_DIR", os.path.join(".cache", "snapshots"))
+# Minimum seconds between background snapshot writes of one frame
+SNAPSHOT_INTERVAL = float(os.getenv("DASHBOARD_SNAPSHOT_INTERVAL", "60"))
+# Bump when prepare_rows changes what it produces; older snapshots are
+# then rebuilt instead of mixing old and new labels
+SNAPSHOT_LAYOUT = 2
+
+
+# =============================
+# Arrow IPC Snapshot
+# =============================
+class FrameSnapshot:
+    # One derived frame on disk as an Arrow IPC file plus a manifest with
+    # the ingest store version it was built from. Loading memory-maps the
+    # file, so a restart reads it back without parsing anything; the
+    # caller then catches up from that version.
+
+    def __init__(self, name, directory=SNAPSHOT_DIR, interval=SNAPSHOT_INTERVAL):
+        self.name = name
+        self.directory = directory
+        self.interval = interval
+        self._last_save = 0.0
+        self._writing = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def _data_path(self):
+        return os.path.join(self.directory, f"{self.name}.arrow")
+
+    @property
+    def _manifest_path(self):
+        return os.path.join(self.directory, f"{self.name}.json")
+
+    def load(self, max_version=None):
+        # -> (frame, manifest), or (None, None) when there is no usable
+        # snapshot. A snapshot newer than the store (store wiped) is stale.
+        try:
+            with open(self._manifest_path) as f:
+                manifest = json.load(f)
+            if manifest.get("layout") != SNAPSHOT_LAYOUT:
+                return None, None
+            if max_version is not None and manifest["version"] > max_version:
+                return None, None
+            source = pa.memory_map(self._data_path, "r")
+            table = pa.ipc.open_file(source).read_all()
+            if table.num_rows != manifest["rows"]:
+                return None, None
+            return table.to_pandas(), manifest
+        except (FileNotFoundError, KeyError, json.JSONDecodeError, pa.ArrowInvalid) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"❌ Snapshot {self.name} unreadable, rebuilding: {e}")
+            return None, None
+
+    def save(self, frame, version, **extra):
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        tmp = self._data_path + ".tmp"
+        with pa.OSFile(tmp, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp, self._data_path)
+
+        # Manifest last: it only ever points at a complete data file
+        manifest = {
+            "version": version,
+            "layout": SNAPSHOT_LAYOUT,
+            "rows": table.num_rows,
+            "written_at": time.time(),
+            **extra,
+        }
+        tmp = self._manifest_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, default=str)
+        os.replace(tmp, self._manifest_path)
+
+    def save_later(self, frame, version, force=False, **extra):
+        # Background write, at most once per interval unless forced. The
+        # frame is never mutated after it is published, so no copy is made.
+        if not force and time.monotonic() - self._last_save < self.interval:
+            return
+        if not self._writing.acquire(blocking=False):
+            return
+        self._last_save = time.monotonic()
+
+        def write():
+            try:
+                self.save(frame, version, **extra)
+            except Exception as e:
+                print(f"❌ Snapshot {self.name} write error: {e}")
+            finally:
+                self._writing.release()
+
+        threading.Thread(target=write, name=f"snapshot-{self.name}", daemon=True).start()
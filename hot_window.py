@@ -0,0 +1,195 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from chart_buckets import SHIFT_START
+from ingest_store import get_ingest_store
+from prepared_frame import CUSTOM_ORDER_TIME, get_prepared_frame, prepare_rows
+
+# =============================
+# Settings
+# Axis capacities are preallocated; a day that needs more falls back to
+# the historical rollups.
+# =============================
+MAX_TYPES = 4
+MAX_BATCHES = 64
+MAX_STATIONS = 64
+
+AXES = ("TYPE", "Batch", "Station")
+
+
+def production_day(now=None):
+    # The production day starts with the 10:00 slot: before the 09:00
+    # shift change the night-shift slots still belong to yesterday. The
+    # dashboard's date default uses this too, so it matches the window.
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    return (now - SHIFT_START).normalize()
+
+
+# =============================
+# Today Window
+# =============================
+class TodayWindow:
+    # OK/NG of one production day in preallocated arrays indexed by
+    # type x batch x station x time slot. A new store row is added to its
+    # cell; raw keys that normalise to the same cell are summed, as in
+    # the rollups. Readers and the refresh share the window's lock.
+
+    def __init__(self, slots=CUSTOM_ORDER_TIME, capacity=(MAX_TYPES, MAX_BATCHES, MAX_STATIONS)):
+        self.slots = list(slots)
+        self.capacity = dict(zip(AXES, capacity))
+        shape = tuple(capacity) + (len(self.slots),)
+        self.ok = np.zeros(shape, dtype=np.int64)
+        self.ng = np.zeros(shape, dtype=np.int64)
+        self.present = np.zeros(shape, dtype=bool)
+        self._slot_offsets = pd.to_timedelta([s + ":00" for s in self.slots])
+        self.labels = {axis: {} for axis in AXES}
+        self.day = None
+        self.overflow = False
+        self._lock = threading.Lock()
+
+    def covers(self, date_range):
+        # Only the current production day, and only while it still is
+        return (
+            not self.overflow
+            and date_range is not None
+            and self.day == production_day()
+            and pd.Timestamp(date_range[0]) == self.day
+            and pd.Timestamp(date_range[1]) == self.day
+        )
+
+    def _codes(self, axis, values):
+        # Value -> axis position, assigning new positions as values appear
+        labels = self.labels[axis]
+        codes, uniques = pd.factorize(values)
+        lookup = np.empty(len(uniques) + 1, dtype=np.int64)
+        lookup[-1] = -1  # NaN
+        for i, value in enumerate(uniques):
+            code = labels.get(value)
+            if code is None and len(labels) < self.capacity[axis]:
+                code = labels[value] = len(labels)
+            lookup[i] = -2 if code is None else code  # -2: axis is full
+        return lookup[codes]
+
+    def apply(self, rows):
+        # Prepared rows; anything not on this production day is ignored
+        rows = rows[rows["Date"] == self.day]
+        if rows.empty:
+            return 0
+
+        with self._lock:
+            slot = pd.Categorical(rows["Time"].astype(str), categories=self.slots).codes.astype(np.int64)
+            codes = [self._codes(axis, rows[axis].astype(object)) for axis in AXES]
+            known = (slot >= 0) & np.logical_and.reduce([c >= 0 for c in codes])
+            if any((c == -2).any() for c in codes):
+                self.overflow = True
+
+            # add.at: several rows of one batch can land on the same cell
+            cell = tuple(c[known] for c in codes) + (slot[known],)
+            np.add.at(self.ok, cell, rows["OK"].to_numpy()[known])
+            np.add.at(self.ng, cell, rows["NG"].to_numpy()[known])
+            self.present[cell] = True
+            return int(known.sum())
+
+    def _axis_mask(self, axis, value):
+        mask = np.zeros(self.capacity[axis], dtype=bool)
+        if value is None:
+            mask[:] = True
+            return mask
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        labels = self.labels[axis]
+        for v in values:
+            if v in labels:
+                mask[labels[v]] = True
+        return mask
+
+    def cells(self, **equals):
+        # Long rows (Date, Time, DateTime, Station, TYPE, Batch, OK, NG) of
+        # the filled cells; equals works like FilterIndex.select
+        with self._lock:
+            selected = self.present.copy()
+            for i, axis in enumerate(AXES):
+                shape = [1] * selected.ndim
+                shape[i] = -1
+                selected &= self._axis_mask(axis, equals.get(axis)).reshape(shape)
+
+            index = np.nonzero(selected)
+            names = {}
+            for i, axis in enumerate(AXES):
+                by_code = np.empty(self.capacity[axis], dtype=object)
+                for label, code in self.labels[axis].items():
+                    by_code[code] = label
+                names[axis] = by_code[index[i]]
+            ok = self.ok[index]
+            ng = self.ng[index]
+
+        slot = index[3]
+        return pd.DataFrame({
+            "Date": self.day,
+            "Time": pd.Categorical.from_codes(slot, categories=self.slots, ordered=True),
+            "DateTime": self.day + self._slot_offsets[slot],
+            "Station": names["Station"],
+            "TYPE": names["TYPE"],
+            "Batch": names["Batch"],
+            "OK": ok,
+            "NG": ng,
+        })
+
+
+# =============================
+# Window Cache
+# =============================
+class TodayWindowCache:
+    # Keeps the window on the current production day and in step with
+    # the ingest store: each refresh adds only the newly written rows.
+    # A day change or a corrected row (which would be counted twice)
+    # builds a new window off to the side and swaps it in, so readers
+    # never see a half-built one.
+
+    def __init__(self, store):
+        self.store = store
+        self.window = TodayWindow()
+        self.version = -1
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        with self._lock:
+            day = production_day()
+            if self.window.day != day or self.version < 0:
+                self._rebuild(day)
+            elif self.version != self.store.version:
+                changes, replaces, version = self.store.changes_since(self.version)
+                # Only today's raw rows are worth preparing
+                dates = pd.to_datetime(changes["Date"], errors="coerce")
+                today = changes[dates == day]
+                if replaces and not today.empty:
+                    self._rebuild(day)
+                else:
+                    if not today.empty:
+                        self.window.apply(prepare_rows(today))
+                    self.version = version
+            return self
+
+    def _rebuild(self, day):
+        # Seed from the shared prepared frame (already parsed)
+        prepared = get_prepared_frame()
+        window = TodayWindow()
+        window.day = day
+        frame = prepared.frame
+        if frame is not None and len(frame):
+            window.apply(frame[frame["Date"] == day])
+        self.window = window
+        self.version = prepared.version
+
+
+_today = None
+_today_lock = threading.Lock()
+
+
+def get_today_window():
+    global _today
+    with _today_lock:
+        if _today is None:
+            _today = TodayWindowCache(get_ingest_store())
+    return _today.refresh().window
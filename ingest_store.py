@@ -0,0 +1,223 @@
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# =============================
+# Settings
+# =============================
+STORE_DIR = os.getenv("DASHBOARD_STORE_DIR", os.path.join(".cache", "ingest"))
+MAX_PARTS = int(os.getenv("DASHBOARD_STORE_MAX_PARTS", "50"))
+
+SHEET_COLUMNS = ["Date", "Time", "Station", "TYPE", "Batch", "OK", "NG"]
+TEXT_COLUMNS = ["Date", "Time", "Station", "TYPE", "Batch"]
+COUNT_COLUMNS = ["OK", "NG"]
+
+# A row is identified by when/where/what it was recorded for. TYPE is part
+# of the key so TX and RX entries of one batch do not overwrite each other.
+KEY_COLUMNS = ["Date", "Time", "Station", "Batch", "TYPE"]
+
+STORE_SCHEMA = pa.schema(
+    [(column, pa.string()) for column in TEXT_COLUMNS]
+    + [(column, pa.int64()) for column in COUNT_COLUMNS]
+    + [("_key", pa.uint64()), ("_row", pa.uint64())]
+)
+
+
+# =============================
+# Normalisation / Hashing
+# =============================
+def normalize_sheet_frame(frame):
+    frame = frame.reindex(columns=SHEET_COLUMNS)
+    for column in TEXT_COLUMNS:
+        frame[column] = frame[column].astype("string").str.strip()
+    for column in COUNT_COLUMNS:
+        frame[column] = pd.to_numeric(frame[column], errors="coerce").fillna(0).astype("int64")
+    frame = frame.dropna(subset=["Date", "Time", "Station"]).copy()
+
+    frame["_key"] = pd.util.hash_pandas_object(frame[KEY_COLUMNS], index=False).to_numpy()
+    frame["_row"] = pd.util.hash_pandas_object(frame[SHEET_COLUMNS], index=False).to_numpy()
+    # The sheet can hold the same key twice; the last entry wins
+    return frame.drop_duplicates("_key", keep="last").reset_index(drop=True)
+
+
+# =============================
+# Parquet Store
+# =============================
+class IngestStore:
+    # Append-only Parquet parts plus a manifest. Only rows with an unseen
+    # key, or a known key whose values changed, are written; readers
+    # resolve updates by keeping the newest row per key.
+
+    def __init__(self, directory=STORE_DIR):
+        self.directory = directory
+        self._lock = threading.RLock()
+        self._frame = None
+        self._frame_version = -1
+        os.makedirs(directory, exist_ok=True)
+        self._manifest = self._read_manifest()
+        # Key/row hashes are only needed by writes; loading them lazily
+        # keeps them off the cold-start path of the page
+        self._seen_hashes = None
+
+    # ---- manifest -------------------------------------------------
+    @property
+    def _manifest_path(self):
+        return os.path.join(self.directory, "manifest.json")
+
+    def _read_manifest(self):
+        try:
+            with open(self._manifest_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"version": 0, "next_part": 1, "compacted": 0, "parts": []}
+
+    def _write_manifest(self, manifest):
+        tmp = self._manifest_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, self._manifest_path)
+        self._manifest = manifest
+
+    @property
+    def version(self):
+        return self._manifest["version"]
+
+    @property
+    def row_count(self):
+        return len(self._seen)
+
+    @property
+    def _seen(self):
+        with self._lock:
+            if self._seen_hashes is None:
+                self._seen_hashes = self._load_seen()
+            return self._seen_hashes
+
+    @_seen.setter
+    def _seen(self, value):
+        self._seen_hashes = value
+
+    def _part_path(self, part):
+        return os.path.join(self.directory, part["file"])
+
+    def _load_seen(self):
+        # key hash -> row hash of every row currently in the store
+        seen = [
+            pq.read_table(self._part_path(part), columns=["_key", "_row"]).to_pandas()
+            for part in self._manifest["parts"]
+        ]
+        if not seen:
+            return pd.Series([], index=pd.Index([], dtype="uint64"), dtype="uint64")
+        seen = pd.concat(seen).set_index("_key")["_row"]
+        return seen[~seen.index.duplicated(keep="last")]
+
+    def _fresh_rows(self, frame):
+        keys = pd.Index(frame["_key"])
+        known = keys.isin(self._seen.index)
+        changed = np.zeros(len(frame), dtype=bool)
+        if known.any():
+            changed[known] = (
+                self._seen.reindex(keys[known]).to_numpy() != frame["_row"].to_numpy()[known]
+            )
+        return frame[~known | changed], int(changed.sum())
+
+    # ---- writes ---------------------------------------------------
+    def append(self, frame):
+        # Returns the number of new or changed rows written
+        frame = normalize_sheet_frame(frame)
+        with self._lock:
+            fresh, updates = self._fresh_rows(frame)
+            if fresh.empty:
+                return 0
+
+            manifest = dict(self._manifest)
+            part = {
+                "file": f"part-{manifest['next_part']:06d}.parquet",
+                "version": manifest["version"] + 1,
+                "rows": len(fresh),
+                "updates": updates,
+            }
+            table = pa.Table.from_pandas(fresh, schema=STORE_SCHEMA, preserve_index=False)
+            pq.write_table(table, self._part_path(part))
+
+            manifest["version"] = part["version"]
+            manifest["next_part"] += 1
+            manifest["parts"] = manifest["parts"] + [part]
+            self._write_manifest(manifest)
+            seen = pd.concat([self._seen, fresh.set_index("_key")["_row"]])
+            self._seen = seen[~seen.index.duplicated(keep="last")]
+
+            if len(manifest["parts"]) > MAX_PARTS:
+                self.compact()
+            return len(fresh)
+
+    def compact(self):
+        with self._lock:
+            frame = self.read()
+            manifest = dict(self._manifest)
+            part = {
+                "file": f"part-{manifest['next_part']:06d}.parquet",
+                "version": manifest["version"],
+                "rows": len(frame),
+                "updates": 0,
+            }
+            table = pa.Table.from_pandas(frame, schema=STORE_SCHEMA, preserve_index=False)
+            pq.write_table(table, self._part_path(part))
+
+            old_parts = manifest["parts"]
+            manifest["next_part"] += 1
+            manifest["compacted"] = manifest["version"]
+            manifest["parts"] = [part]
+            self._write_manifest(manifest)
+            for old in old_parts:
+                os.remove(self._part_path(old))
+
+    # ---- reads ----------------------------------------------------
+    def _read_parts(self, parts):
+        if not parts:
+            return STORE_SCHEMA.empty_table().to_pandas()
+        tables = [pq.read_table(self._part_path(part), schema=STORE_SCHEMA) for part in parts]
+        frame = pa.concat_tables(tables).to_pandas()
+        if any(part["updates"] for part in parts[1:]):
+            frame = frame.drop_duplicates("_key", keep="last", ignore_index=True)
+        return frame
+
+    def read(self):
+        # Full current state, cached per version. Shared: do not mutate.
+        with self._lock:
+            if self._frame_version != self.version:
+                self._frame = self._read_parts(self._manifest["parts"])
+                self._frame_version = self.version
+            return self._frame
+
+    def snapshot(self):
+        with self._lock:
+            return self.read(), self.version
+
+    def changes_since(self, version):
+        # (rows written after `version`, whether any of them replace older
+        # rows, the store version the answer is good up to)
+        with self._lock:
+            if version < self._manifest.get("compacted", 0):
+                # Parts past `version` were merged away: start over
+                return self.read(), True, self.version
+            parts = [p for p in self._manifest["parts"] if p["version"] > version]
+            frame = self._read_parts(parts)
+            return frame, any(p["updates"] for p in parts), self.version
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_ingest_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = IngestStore()
+        return _store
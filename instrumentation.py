@@ -0,0 +1,191 @@
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+# =============================
+# Settings
+# =============================
+# Shows the admin sidebar panel on every page; ?admin=1 shows it for one session
+ADMIN_PANEL = os.getenv("DASHBOARD_ADMIN", "").strip().lower() in ("1", "true", "yes")
+# Append one JSON line per rerun to this file (empty = off)
+METRICS_LOG = os.getenv("DASHBOARD_METRICS_LOG", "")
+SQL_LABEL_LENGTH = 80
+
+# Roughly when the server process started: this module is imported on
+# the first page load
+PROCESS_STARTED = time.time()
+
+_lock = threading.Lock()
+_stages = {}
+_queries = {}
+_counters = {}
+_pages = {}
+# Stage timings of the rerun running on this thread (Streamlit runs each
+# session's script on its own thread)
+_run = threading.local()
+
+
+def _observe(table, key, seconds, rows=None):
+    entry = table.get(key)
+    if entry is None:
+        entry = table[key] = {"count": 0, "seconds": 0.0, "max": 0.0, "rows": 0}
+    entry["count"] += 1
+    entry["seconds"] += seconds
+    entry["max"] = max(entry["max"], seconds)
+    if rows is not None and rows >= 0:
+        entry["rows"] += rows
+
+
+# =============================
+# Stage Timers
+# =============================
+@contextmanager
+def timed(stage):
+    # `with timed("dashboard.pivot"):` or `@timed("dashboard.pivot")`
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        with _lock:
+            _observe(_stages, stage, seconds)
+        stages = getattr(_run, "stages", None)
+        if stages is not None:
+            stages.append((stage, seconds))
+
+
+def start_run(page):
+    _run.page = page
+    _run.started = time.perf_counter()
+    _run.stages = []
+
+
+def finish_run():
+    # -> {"page", "seconds", "stages"} for the rerun on this thread
+    stages = getattr(_run, "stages", None)
+    if stages is None:
+        return None
+    run = {
+        "page": _run.page,
+        "seconds": round(time.perf_counter() - _run.started, 4),
+        "stages": [(stage, round(seconds, 4)) for stage, seconds in stages],
+    }
+    _run.last = run
+    _run.stages = None
+    if METRICS_LOG:
+        with _lock, open(METRICS_LOG, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"time": time.time(), **run}) + "\n")
+    return run
+
+
+def last_run():
+    return getattr(_run, "last", None)
+
+
+# =============================
+# Page Startup
+# =============================
+def record_page_run(page, seconds):
+    # The first run of a page in this process includes its imports and
+    # shared resource setup: that is its cold-start cost.
+    now = time.time()
+    with _lock:
+        entry = _pages.get(page)
+        if entry is None:
+            entry = _pages[page] = {
+                "cold_seconds": round(seconds, 4),
+                "ready_after_start": round(now - PROCESS_STARTED, 4),
+                "runs": 0,
+                "warm_seconds": None,
+                "warm_max": None,
+            }
+        else:
+            entry["warm_seconds"] = round(seconds, 4)
+            entry["warm_max"] = round(max(entry["warm_max"] or 0.0, seconds), 4)
+        entry["runs"] += 1
+
+
+def startup_report():
+    with _lock:
+        return {
+            "process_started": PROCESS_STARTED,
+            "uptime": round(time.time() - PROCESS_STARTED, 1),
+            "pages": {page: dict(entry) for page, entry in _pages.items()},
+        }
+
+
+# =============================
+# Queries / Counters
+# =============================
+def sql_label(query):
+    text = query.decode() if isinstance(query, bytes) else str(query)
+    return re.sub(r"\s+", " ", text).strip()[:SQL_LABEL_LENGTH]
+
+
+def record_query(query, seconds, rows=None):
+    label = sql_label(query)
+    with _lock:
+        _observe(_queries, label, seconds, rows)
+
+
+def count(name, n=1):
+    # Cache hits/misses and similar event counters
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+# =============================
+# Export
+# =============================
+def snapshot():
+    with _lock:
+        return {
+            "stages": {k: dict(v) for k, v in _stages.items()},
+            "queries": {k: dict(v) for k, v in _queries.items()},
+            "counters": dict(_counters),
+            "pages": {k: dict(v) for k, v in _pages.items()},
+        }
+
+
+def to_json():
+    return json.dumps(snapshot(), indent=2)
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _family(lines, metric, label, entries, field):
+    # One metric family; Prometheus wants its samples kept together
+    lines.append(f"# TYPE {metric} counter")
+    for key, entry in sorted(entries.items()):
+        value = entry[field]
+        value = f"{value:.6f}" if isinstance(value, float) else value
+        lines.append(f'{metric}{{{label}="{_escape(key)}"}} {value}')
+
+
+def to_prometheus():
+    data = snapshot()
+    lines = []
+    _family(lines, "dashboard_stage_seconds_total", "stage", data["stages"], "seconds")
+    _family(lines, "dashboard_stage_calls_total", "stage", data["stages"], "count")
+    _family(lines, "dashboard_query_seconds_total", "query", data["queries"], "seconds")
+    _family(lines, "dashboard_query_calls_total", "query", data["queries"], "count")
+    _family(lines, "dashboard_query_rows_total", "query", data["queries"], "rows")
+    counters = {name: {"value": value} for name, value in data["counters"].items()}
+    _family(lines, "dashboard_events_total", "event", counters, "value")
+    lines.append("# TYPE dashboard_page_cold_start_seconds gauge")
+    for page, entry in sorted(data["pages"].items()):
+        lines.append(f'dashboard_page_cold_start_seconds{{page="{_escape(page)}"}} {entry["cold_seconds"]:.6f}')
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    with _lock:
+        _stages.clear()
+        _queries.clear()
+        _counters.clear()
+        _pages.clear()
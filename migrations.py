@@ -0,0 +1,144 @@
+import threading
+
+from psycopg2 import DatabaseError
+
+from database_connect import create_production_table
+from partitioning import (
+    PARTITION_INTERVAL,
+    create_partitioned_production_table,
+    maintain_partitions
+)
+
+# =============================
+# SQL: Migration Bookkeeping
+# =============================
+CREATE_MIGRATIONS_TABLE_QUERY = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INTEGER PRIMARY KEY,
+    description TEXT NOT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+# Serialises concurrent app processes starting at the same time
+MIGRATION_LOCK_ID = 470_805_001
+
+# =============================
+# Migrations (append only, never edit an applied one)
+# =============================
+MIGRATIONS = [
+    (
+        1,
+        "production_data covering indexes for date/station/batch/line filters",
+        """
+        CREATE INDEX IF NOT EXISTS idx_production_date_station
+            ON production_data (production_date, station_name)
+            INCLUDE (ok_quantity, ng_quantity);
+
+        CREATE INDEX IF NOT EXISTS idx_production_batch_model_station
+            ON production_data (batch_number, model_type, station_name)
+            INCLUDE (ok_quantity, ng_quantity);
+
+        CREATE INDEX IF NOT EXISTS idx_production_line_date
+            ON production_data (product_line, production_date)
+            INCLUDE (ok_quantity, ng_quantity);
+        """,
+    ),
+    (
+        2,
+        "notify listeners on production_data writes",
+        """
+        CREATE OR REPLACE FUNCTION notify_production_data_change() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('production_data_changed', TG_OP);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS production_data_notify ON production_data;
+        CREATE TRIGGER production_data_notify
+        AFTER INSERT OR UPDATE OR DELETE ON production_data
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_production_data_change();
+        """,
+    ),
+    (
+        3,
+        "production_data submission ids for idempotent write queue retries",
+        """
+        ALTER TABLE production_data ADD COLUMN IF NOT EXISTS submission_id UUID;
+
+        -- Partitioned tables need the partition key in unique indexes;
+        -- the queue stamps the date at submission, so it is stable
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_production_submission
+            ON production_data (submission_id, production_date);
+        """,
+    ),
+    (
+        4,
+        "log production_data inserts in the change log",
+        """
+        DROP TRIGGER IF EXISTS production_data_change_log ON production_data;
+        CREATE TRIGGER production_data_change_log
+        AFTER INSERT OR UPDATE OR DELETE ON production_data
+        FOR EACH ROW EXECUTE FUNCTION log_production_data_change();
+
+        CREATE INDEX IF NOT EXISTS idx_production_changes_changed_at
+            ON production_data_changes (changed_at);
+        """,
+    ),
+]
+
+
+# =============================
+# Runner
+# =============================
+def apply_migrations(connection):
+    applied = []
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(CREATE_MIGRATIONS_TABLE_QUERY)
+            cursor.execute("SELECT pg_advisory_xact_lock(%s);", (MIGRATION_LOCK_ID,))
+            cursor.execute("SELECT version FROM schema_migrations;")
+            done = {row[0] for row in cursor.fetchall()}
+
+            for version, description, sql in MIGRATIONS:
+                if version in done:
+                    continue
+                cursor.execute(sql)
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, description) VALUES (%s, %s);",
+                    (version, description)
+                )
+                applied.append(version)
+        connection.commit()
+    except DatabaseError as e:
+        print(f"❌ Migration error: {e}")
+        connection.rollback()
+        return None
+
+    return applied
+
+
+_initialized = False
+_init_lock = threading.Lock()
+
+
+def initialize_database(connection):
+    # Table creation + migrations, once per process instead of every rerun
+    global _initialized
+    with _init_lock:
+        if _initialized:
+            return
+        if PARTITION_INTERVAL and create_partitioned_production_table(connection):
+            maintain_partitions(connection)
+        else:
+            create_production_table(connection)
+        _initialized = apply_migrations(connection) is not None
+
+
+def reset_initialization():
+    # After the tables were dropped: the next initialize_database call
+    # recreates them and runs every migration again
+    global _initialized
+    with _init_lock:
+        _initialized = False
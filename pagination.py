@@ -0,0 +1,196 @@
+import threading
+import time
+
+import pandas as pd
+
+from instrumentation import count
+from record_schema import apply_production_schema
+
+# =============================
+# Paginated Tables
+# Only tables/columns listed here can reach the generated SQL. "schema"
+# types a fetched page (categoricals, small ints, datetimes).
+# =============================
+PAGINATED_TABLES = {
+    "production_data": {
+        "key": ("id",),
+        "columns": (
+            "id", "station_name", "model_type", "batch_number", "tray_number",
+            "product_line", "supplier_name", "ok_quantity", "ng_quantity",
+            "operator_name", "remarks", "production_date",
+        ),
+        "schema": apply_production_schema,
+    },
+    "production_dashboard": {
+        "key": ("production_date", "id"),
+        "columns": (
+            "id", "production_date", "station_name", "model_type",
+            "ok_quantity", "ng_quantity", "production_time_min",
+            "batch_number", "product_line",
+        ),
+    },
+}
+
+COUNT_CACHE_TTL = 30
+
+_count_cache = {}
+_count_lock = threading.Lock()
+
+
+# =============================
+# WHERE Clause Builder
+# =============================
+def _table_spec(table):
+    if table not in PAGINATED_TABLES:
+        raise ValueError(f"Table not paginated: {table}")
+    return PAGINATED_TABLES[table]
+
+
+def build_where(table, filters):
+    # filters: {column: value}
+    #   list/set -> column = ANY(...)
+    #   tuple    -> (start, end) range, end exclusive, either side optional
+    #   scalar   -> column = value
+    spec = _table_spec(table)
+    clauses, params = [], []
+
+    for column, value in (filters or {}).items():
+        if column not in spec["columns"]:
+            raise ValueError(f"Unknown filter column: {column}")
+        if value is None:
+            continue
+
+        if isinstance(value, (list, set)):
+            if not value:
+                continue
+            clauses.append(f"{column} = ANY(%s)")
+            params.append(list(value))
+        elif isinstance(value, tuple):
+            start, end = value
+            if start is not None:
+                clauses.append(f"{column} >= %s")
+                params.append(start)
+            if end is not None:
+                clauses.append(f"{column} < %s")
+                params.append(end)
+        else:
+            clauses.append(f"{column} = %s")
+            params.append(value)
+
+    return clauses, params
+
+
+def _filters_key(table, filters):
+    items = []
+    for column, value in sorted((filters or {}).items()):
+        if isinstance(value, (list, set)):
+            value = tuple(sorted(value, key=str))
+        items.append((column, value))
+    return table, tuple(items)
+
+
+# =============================
+# Keyset Pagination
+# =============================
+def fetch_page(connection, table, filters=None, page_size=50, after=None):
+    # Newest first. `after` is the key tuple of the last row on the
+    # previous page (see page_cursor).
+    spec = _table_spec(table)
+    key = spec["key"]
+    clauses, params = build_where(table, filters)
+
+    if after is not None:
+        key_list = ", ".join(key)
+        placeholders = ", ".join(["%s"] * len(key))
+        clauses.append(f"({key_list}) < ({placeholders})")
+        params.extend(after)
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    order = ", ".join(f"{column} DESC" for column in key)
+    query = f"SELECT * FROM {table} {where} ORDER BY {order} LIMIT %s;"
+    params.append(int(page_size))
+
+    page = pd.read_sql(query, connection, params=params)
+    schema = spec.get("schema")
+    return schema(page) if schema else page
+
+
+def page_cursor(table, page):
+    if page is None or page.empty:
+        return None
+    last = page.iloc[-1]
+    return tuple(
+        value.to_pydatetime() if isinstance(value, pd.Timestamp) else
+        value.item() if hasattr(value, "item") else value
+        for value in (last[column] for column in _table_spec(table)["key"])
+    )
+
+
+# =============================
+# Cached Counts / Totals
+# =============================
+def _cached(cache_key, ttl, compute):
+    now = time.monotonic()
+    with _count_lock:
+        hit = _count_cache.get(cache_key)
+        if hit and now - hit[0] < ttl:
+            count("pagination.cache.hit")
+            return hit[1]
+
+    count("pagination.cache.miss")
+    value = compute()
+    with _count_lock:
+        _count_cache[cache_key] = (now, value)
+    return value
+
+
+def _aggregate(connection, table, select, filters):
+    clauses, params = build_where(table, filters)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {select} FROM {table} {where};", params)
+        return cursor.fetchone()
+
+
+def count_rows(connection, table, filters=None, ttl=COUNT_CACHE_TTL):
+    return _cached(
+        ("count",) + _filters_key(table, filters),
+        ttl,
+        lambda: int(_aggregate(connection, table, "COUNT(*)", filters)[0]),
+    )
+
+
+def sum_columns(connection, table, columns, filters=None, ttl=COUNT_CACHE_TTL):
+    spec = _table_spec(table)
+    for column in columns:
+        if column not in spec["columns"]:
+            raise ValueError(f"Unknown column: {column}")
+
+    select = ", ".join(f"COALESCE(SUM({column}), 0)" for column in columns)
+    return _cached(
+        ("sum", tuple(columns)) + _filters_key(table, filters),
+        ttl,
+        lambda: dict(zip(columns, (int(v) for v in _aggregate(connection, table, select, filters)))),
+    )
+
+
+def distinct_values(connection, table, column, ttl=300):
+    if column not in _table_spec(table)["columns"]:
+        raise ValueError(f"Unknown column: {column}")
+
+    def compute():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT DISTINCT {column} FROM {table} "
+                f"WHERE {column} IS NOT NULL ORDER BY {column};"
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    return _cached(("distinct", table, column), ttl, compute)
+
+
+def invalidate_counts(table=None):
+    with _count_lock:
+        for cache_key in list(_count_cache):
+            if table is None or table in cache_key:
+                del _count_cache[cache_key]
@@ -0,0 +1,149 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from record_schema import align_categories
+
+# =============================
+# Settings
+# =============================
+# 0 or 1 turns the process pool off
+AGG_WORKERS = int(os.getenv("DASHBOARD_AGG_WORKERS", str(os.cpu_count() or 1)))
+# Below this many rows shipping shards to other processes costs more
+# than it saves
+PARALLEL_MIN_ROWS = int(os.getenv("DASHBOARD_PARALLEL_MIN_ROWS", "500000"))
+SHARDS_PER_WORKER = 2
+
+
+def group_sum(frame, keys, values):
+    # Same grouping rules as the rollups: observed categories only, NaN
+    # keys kept, input order.
+    return frame.groupby(keys, as_index=False, observed=True, sort=False, dropna=False)[list(values)].sum()
+
+
+# =============================
+# Worker Side
+# =============================
+def _sum_shard(shm_name, size, keys, values):
+    # Runs in a pool process: read the Arrow IPC stream straight out of
+    # shared memory, aggregate, and return only the (small) partial.
+    try:
+        # The parent owns (and unlinks) the block
+        shm = shared_memory.SharedMemory(name=shm_name, track=False)
+    except TypeError:  # Python < 3.13
+        shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        reader = pa.ipc.open_stream(pa.py_buffer(shm.buf[:size]))
+        table = reader.read_all()
+        frame = table.to_pandas()
+        partial = group_sum(frame, keys, values)
+        # Nothing may still point into the block when it is closed
+        del reader, table, frame
+        return partial
+    finally:
+        try:
+            shm.close()
+        except BufferError:
+            # A view is still alive; the mapping goes when the worker exits
+            pass
+
+
+# =============================
+# Sharding
+# =============================
+def date_shards(dates, n_shards):
+    # -> shard id per row. Whole days go to one shard, so partials never
+    # share a key and merging is a concat.
+    days = dates.to_numpy(dtype="datetime64[D]")
+    unique_days, inverse, counts = np.unique(days, return_inverse=True, return_counts=True)
+    starts = np.cumsum(counts) - counts
+    day_shard = np.minimum(starts * n_shards // max(len(days), 1), n_shards - 1)
+    return day_shard[inverse]
+
+
+def _to_shared_memory(frame):
+    sink = pa.BufferOutputStream()
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    buffer = sink.getvalue()
+
+    shm = shared_memory.SharedMemory(create=True, size=max(buffer.size, 1))
+    try:
+        # Arrow buffers export signed bytes ('b'), shared memory is 'B'
+        shm.buf[:buffer.size] = memoryview(buffer).cast("B")
+    except Exception:
+        shm.close()
+        shm.unlink()
+        raise
+    return shm, buffer.size
+
+
+# =============================
+# Process Pool
+# =============================
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor(workers=AGG_WORKERS):
+    # Spawned, not forked: the app process runs sync/listener threads
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def shutdown_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(cancel_futures=True)
+        _executor = None
+
+
+def parallel_group_sum(frame, keys, values, date_column="Date", workers=AGG_WORKERS):
+    # group_sum sharded by date across the process pool. `keys` must
+    # include date_column. Small frames, or a pool that cannot start, fall
+    # back to a plain in-process groupby.
+    if workers <= 1 or len(frame) < PARALLEL_MIN_ROWS or date_column not in keys:
+        return group_sum(frame, keys, values)
+
+    columns = list(dict.fromkeys(list(keys) + list(values)))
+    shard_ids = date_shards(frame[date_column], workers * SHARDS_PER_WORKER)
+
+    blocks = []
+    try:
+        executor = get_executor(workers)
+        futures = []
+        for shard in np.unique(shard_ids):
+            shm, size = _to_shared_memory(frame[columns].take(np.flatnonzero(shard_ids == shard)))
+            blocks.append(shm)
+            futures.append(executor.submit(_sum_shard, shm.name, size, list(keys), list(values)))
+        partials = [future.result() for future in futures]
+    except Exception as e:
+        print(f"❌ Parallel aggregation error, running in-process: {e}")
+        shutdown_executor()
+        return group_sum(frame, keys, values)
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+    categorical = [c for c in keys if isinstance(frame[c].dtype, pd.CategoricalDtype)]
+    merged = pd.concat(align_categories(partials, categorical), ignore_index=True)
+
+    # The Arrow round trip turns nullable columns (Int32 ISO weeks) into
+    # plain NumPy ones; match the dtypes the in-process path produces
+    serial = group_sum(frame.iloc[:0], keys, values).dtypes
+    return merged.astype({c: t for c, t in serial.items() if c not in categorical})
@@ -0,0 +1,220 @@
+import os
+import re
+from datetime import date, datetime, timedelta
+
+from psycopg2 import DatabaseError
+
+from database_connect import CREATE_CHANGE_LOG_QUERY, execute_query
+
+# =============================
+# Settings
+# =============================
+# "month", "week" or "" (plain, non-partitioned table)
+PARTITION_INTERVAL = os.getenv("DB_PARTITION_INTERVAL", "").strip().lower()
+PARTITIONS_AHEAD = int(os.getenv("DB_PARTITIONS_AHEAD", "3"))
+# Number of past partitions kept attached; empty keeps everything
+PARTITIONS_RETAIN = int(os.getenv("DB_PARTITIONS_RETAIN") or 0) or None
+ARCHIVE_SCHEMA = "archive"
+
+# =============================
+# SQL: Partitioned Table
+# =============================
+# The partition key has to be part of the primary key
+CREATE_PARTITIONED_TABLE_QUERY = """
+CREATE TABLE IF NOT EXISTS production_data (
+    id SERIAL,
+    station_name TEXT NOT NULL,
+    model_type TEXT NOT NULL,
+    batch_number INTEGER NOT NULL,
+    tray_number INTEGER NOT NULL,
+    product_line TEXT NOT NULL,
+    supplier_name TEXT NOT NULL,
+    ok_quantity INTEGER DEFAULT 0,
+    ng_quantity INTEGER DEFAULT 0,
+    operator_name TEXT NOT NULL,
+    remarks TEXT,
+    production_date TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, production_date)
+) PARTITION BY RANGE (production_date);
+
+CREATE TABLE IF NOT EXISTS production_data_default
+    PARTITION OF production_data DEFAULT;
+"""
+
+TABLE_KIND_QUERY = """
+SELECT c.relkind
+FROM pg_class c
+JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE c.relname = 'production_data' AND n.nspname = current_schema();
+"""
+
+LIST_PARTITIONS_QUERY = """
+SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+FROM pg_inherits i
+JOIN pg_class c ON c.oid = i.inhrelid
+WHERE i.inhparent = 'production_data'::regclass;
+"""
+
+DEFAULT_PARTITION_ROWS_QUERY = "SELECT COUNT(*) FROM production_data_default;"
+
+BOUND_PATTERN = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+# =============================
+# Partition Ranges
+# =============================
+def partition_start(day, interval):
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    if interval == "month":
+        return day.replace(day=1)
+    raise ValueError(f"Unknown partition interval: {interval}")
+
+
+def next_partition_start(start, interval):
+    if interval == "week":
+        return start + timedelta(days=7)
+    if start.month == 12:
+        return start.replace(year=start.year + 1, month=1)
+    return start.replace(month=start.month + 1)
+
+
+def partition_name(start, interval):
+    if interval == "week":
+        iso_year, iso_week, _ = start.isocalendar()
+        return f"production_data_{iso_year}w{iso_week:02d}"
+    return f"production_data_{start.year}m{start.month:02d}"
+
+
+# =============================
+# Table Management
+# =============================
+def table_kind(connection):
+    # "p" partitioned, "r" plain table, None missing
+    with connection.cursor() as cursor:
+        cursor.execute(TABLE_KIND_QUERY)
+        row = cursor.fetchone()
+    connection.commit()
+    return row[0] if row else None
+
+
+def create_partitioned_production_table(connection, interval=PARTITION_INTERVAL, ahead=PARTITIONS_AHEAD):
+    if table_kind(connection) not in (None, "p"):
+        # Converting an existing plain table needs a manual copy
+        print("❌ production_data exists and is not partitioned; skipping partition setup")
+        return False
+
+    execute_query(connection, CREATE_PARTITIONED_TABLE_QUERY)
+    execute_query(connection, CREATE_CHANGE_LOG_QUERY)
+    ensure_partitions(connection, interval, ahead)
+    return True
+
+
+def ensure_partitions(connection, interval=PARTITION_INTERVAL, ahead=PARTITIONS_AHEAD, today=None):
+    # Current partition plus `ahead` future ones
+    start = partition_start(today or date.today(), interval)
+    created = []
+    for _ in range(ahead + 1):
+        end = next_partition_start(start, interval)
+        name = partition_name(start, interval)
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF production_data "
+                    f"FOR VALUES FROM (%s) TO (%s);",
+                    (start, end)
+                )
+            connection.commit()
+            created.append(name)
+        except DatabaseError as e:
+            # Usually rows for this range already landed in the default partition
+            print(f"❌ Partition error ({name}): {e}")
+            connection.rollback()
+        start = end
+    return created
+
+
+def default_partition_rows(connection):
+    # Rows outside every range partition. Any at all mean the partitions
+    # ran out; the range covering them can then no longer be created and
+    # retention never drops them.
+    if table_kind(connection) != "p":
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(DEFAULT_PARTITION_ROWS_QUERY)
+        rows = cursor.fetchone()[0]
+    connection.commit()
+    return rows
+
+
+def list_partitions(connection):
+    with connection.cursor() as cursor:
+        cursor.execute(LIST_PARTITIONS_QUERY)
+        rows = cursor.fetchall()
+    connection.commit()
+
+    partitions = []
+    for name, bound in rows:
+        match = BOUND_PATTERN.search(bound or "")
+        if not match:
+            continue  # default partition
+        start, end = (datetime.fromisoformat(v) for v in match.groups())
+        partitions.append((name, start, end))
+    return sorted(partitions, key=lambda p: p[1])
+
+
+# =============================
+# Retention
+# =============================
+def retire_partitions(connection, older_than, mode="drop"):
+    # Partitions that end on/before `older_than` are dropped, detached,
+    # or detached and moved to the archive schema.
+    if mode not in ("drop", "detach", "archive"):
+        raise ValueError(f"Unknown retention mode: {mode}")
+
+    if not isinstance(older_than, datetime):
+        older_than = datetime.combine(older_than, datetime.min.time())
+    retired = [name for name, _, end in list_partitions(connection) if end <= older_than]
+    if not retired:
+        return []
+
+    try:
+        with connection.cursor() as cursor:
+            if mode == "archive":
+                cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA};")
+            for name in retired:
+                if mode == "drop":
+                    cursor.execute(f"DROP TABLE {name};")
+                    continue
+                cursor.execute(f"ALTER TABLE production_data DETACH PARTITION {name};")
+                if mode == "archive":
+                    cursor.execute(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA};")
+
+            # Whole partitions vanish without row triggers: tell incremental
+            # readers to reload.
+            cursor.execute(
+                "INSERT INTO production_data_changes (record_id, operation) VALUES (NULL, 'T');"
+            )
+        connection.commit()
+    except DatabaseError as e:
+        print(f"❌ Retention error: {e}")
+        connection.rollback()
+        return []
+
+    return retired
+
+
+def purge_production_before(connection, cutoff):
+    return retire_partitions(connection, cutoff, mode="drop")
+
+
+def maintain_partitions(connection, interval=PARTITION_INTERVAL, ahead=PARTITIONS_AHEAD,
+                        retain_partitions=PARTITIONS_RETAIN, mode="archive"):
+    created = ensure_partitions(connection, interval, ahead)
+    retired = []
+    if retain_partitions:
+        start = partition_start(date.today(), interval)
+        for _ in range(retain_partitions):
+            start = partition_start(start - timedelta(days=1), interval)
+        retired = retire_partitions(connection, start, mode)
+    return created, retired
@@ -0,0 +1,134 @@
+import threading
+
+import pandas as pd
+
+from data_info import CUSTOM_ORDER_TIME as SHEET_ORDER_TIME
+from frame_snapshot import FrameSnapshot
+from ingest_store import get_ingest_store
+from record_schema import align_categories as _align_categories
+from record_schema import normalize_labels, normalize_time_labels
+
+# =============================
+# Layout
+# =============================
+# Slot labels in the short form the sheet rows are normalised to
+CUSTOM_ORDER_TIME = normalize_time_labels(pd.Series(SHEET_ORDER_TIME)).tolist()
+
+CATEGORY_COLUMNS = ["Station", "TYPE", "Batch"]
+VALUES = ["OK", "NG"]
+PREPARED_COLUMNS = [
+    "Date", "Time", "DateTime", "ISO_Year", "ISO_Week",
+    "Station", "TYPE", "Batch", "OK", "NG",
+]
+
+
+# =============================
+# Preparation
+# =============================
+def _categories(values, reference=None):
+    # Keep the reference order and append unseen values in order of
+    # appearance, so codes stay stable as data grows.
+    known = list(reference.cat.categories) if reference is not None else []
+    seen = set(known)
+    extra = [v for v in pd.unique(values.dropna()) if v not in seen]
+    return known + extra
+
+
+def prepare_rows(raw, reference=None):
+    # Raw store rows -> typed rows with every derived column computed once.
+    # `reference` (an already prepared frame) fixes the category order.
+    rows = pd.DataFrame(index=raw.index)
+
+    date = pd.to_datetime(raw["Date"], errors="coerce")
+    time = normalize_time_labels(raw["Time"]).astype(str)
+    iso = date.dt.isocalendar()
+
+    rows["Date"] = date
+    rows["Time"] = pd.Categorical(time, categories=CUSTOM_ORDER_TIME, ordered=True)
+    rows["DateTime"] = date + pd.to_timedelta(time + ":00", errors="coerce")
+    rows["ISO_Year"] = iso["year"].astype("Int32")
+    rows["ISO_Week"] = iso["week"].astype("Int32")
+
+    normalized = {
+        # "Lens CCD  Position Check" in the sheet, single-spaced in data_info
+        "Station": normalize_labels(raw["Station"].astype(str)),
+        "TYPE": raw["TYPE"].astype(str).str.strip(),
+        "Batch": raw["Batch"].astype(str).str.strip().str.lower().str.replace(" ", ""),
+    }
+    for column, values in normalized.items():
+        ref = reference[column] if reference is not None else None
+        rows[column] = pd.Categorical(values, categories=_categories(values, ref))
+
+    for column in VALUES:
+        rows[column] = pd.to_numeric(raw[column], errors="coerce").fillna(0).astype("int64")
+
+    return rows.dropna(subset=["Date"]).reset_index(drop=True)
+
+
+def align_categories(frames, columns=CATEGORY_COLUMNS):
+    return _align_categories(frames, columns)
+
+
+def concat_prepared(frames):
+    return pd.concat(align_categories(frames), ignore_index=True)
+
+
+# =============================
+# Shared Prepared Frame
+# =============================
+class PreparedFrameCache:
+    # One prepared frame per store version for the whole process. A new
+    # process starts from the on-disk snapshot and only prepares the rows
+    # ingested since. The frame is shared between sessions: treat it as
+    # read-only.
+
+    def __init__(self, store):
+        self.store = store
+        self.frame = None
+        self.version = -1
+        self.snapshot = FrameSnapshot("prepared")
+        self._lock = threading.Lock()
+
+    def _restore(self):
+        frame, manifest = self.snapshot.load(max_version=self.store.version)
+        if frame is not None:
+            self.frame = frame
+            self.version = manifest["version"]
+
+    def _publish(self, frame, version, rebuilt=False):
+        self.frame = frame
+        self.version = version
+        last_date = frame["Date"].max() if len(frame) else None
+        self.snapshot.save_later(frame, version, force=rebuilt, last_date=last_date)
+
+    def refresh(self):
+        with self._lock:
+            if self.version < 0:
+                self._restore()
+            if self.version == self.store.version:
+                return self
+            if self.version >= 0:
+                changes, replaces, version = self.store.changes_since(self.version)
+                if not replaces:
+                    frame = self.frame
+                    if not changes.empty:
+                        delta = prepare_rows(changes, frame)
+                        frame = concat_prepared([frame, delta])
+                    self._publish(frame, version)
+                    return self
+
+            raw, version = self.store.snapshot()
+            self._publish(prepare_rows(raw), version, rebuilt=True)
+            return self
+
+
+_prepared = None
+_prepared_lock = threading.Lock()
+
+
+def get_prepared_frame():
+    global _prepared
+    with _prepared_lock:
+        if _prepared is None:
+            _prepared = PreparedFrameCache(get_ingest_store())
+    return _prepared.refresh()
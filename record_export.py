@@ -0,0 +1,145 @@
+import itertools
+import os
+import tempfile
+
+import pandas as pd
+
+from database_connect import get_connection
+from pagination import PAGINATED_TABLES, build_where
+
+EXPORT_CHUNK_ROWS = 5000
+# st.download_button cannot stream: the finished file is handed to it as
+# one bytes object and held in server memory while the button is shown,
+# so one export is capped at this many rows.
+EXPORT_MAX_ROWS = int(os.getenv("DASHBOARD_EXPORT_MAX_ROWS", "200000"))
+EXPORT_FORMATS = {
+    "CSV": (".csv", "text/csv"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet"),
+}
+
+# Arrow type per exported column (pyarrow type aliases). Taking the
+# Parquet schema from the data would give an all-NULL column in the
+# first chunk the null type, and later chunks would fail to cast.
+PARQUET_TYPES = {
+    "id": "int32",
+    "station_name": "string",
+    "model_type": "string",
+    "batch_number": "int32",
+    "tray_number": "int32",
+    "product_line": "string",
+    "supplier_name": "string",
+    "ok_quantity": "int32",
+    "ng_quantity": "int32",
+    "operator_name": "string",
+    "remarks": "string",
+    "production_date": "timestamp[us]",
+    "production_time_min": "double",
+}
+
+
+# =============================
+# Server-side Cursor
+# =============================
+def stream_rows(connection, table, filters=None, chunk_size=EXPORT_CHUNK_ROWS, limit=None):
+    # Yields DataFrames of at most chunk_size rows. A named cursor keeps
+    # the result set on the server, so only one chunk is ever in memory.
+    spec = PAGINATED_TABLES[table]
+    clauses, params = build_where(table, filters)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    order = ", ".join(spec["key"])
+    columns = ", ".join(spec["columns"])
+    limit_sql = ""
+    if limit is not None:
+        limit_sql = " LIMIT %s"
+        params.append(int(limit))
+
+    with connection.cursor(name=f"export_{table}") as cursor:
+        cursor.itersize = chunk_size
+        cursor.execute(f"SELECT {columns} FROM {table} {where} ORDER BY {order}{limit_sql};", params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield pd.DataFrame(rows, columns=list(spec["columns"]))
+
+
+# =============================
+# Incremental Writers
+# =============================
+def write_csv(chunks, path):
+    rows = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(f, index=False, header=i == 0)
+            rows += len(chunk)
+    return rows
+
+
+def parquet_schema(columns):
+    import pyarrow as pa
+
+    return pa.schema([pa.field(c, pa.type_for_alias(PARQUET_TYPES.get(c, "string"))) for c in columns])
+
+
+def write_parquet(chunks, path, columns):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rows = 0
+    schema = parquet_schema(columns)
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in chunks:
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            rows += len(chunk)
+    return rows
+
+
+# =============================
+# Export
+# =============================
+def _capped(chunks, max_rows, state):
+    # Passes at most max_rows rows through; state["truncated"] tells
+    # whether anything was cut off
+    remaining = max_rows
+    for chunk in chunks:
+        if len(chunk) > remaining:
+            state["truncated"] = True
+            if remaining:
+                yield chunk.iloc[:remaining]
+            return
+        remaining -= len(chunk)
+        yield chunk
+
+
+def export_records(table, filters=None, fmt="CSV", chunk_size=EXPORT_CHUNK_ROWS, max_rows=EXPORT_MAX_ROWS):
+    # -> (path of a temp file holding the export, rows written, whether
+    # the result was cut at max_rows). The caller owns the file and
+    # removes it when done.
+    suffix, _ = EXPORT_FORMATS[fmt]
+    columns = list(PAGINATED_TABLES[table]["columns"])
+    fd, path = tempfile.mkstemp(prefix=f"{table}_", suffix=suffix)
+    os.close(fd)
+
+    try:
+        with get_connection() as conn:
+            if conn is None:
+                raise ConnectionError("database unavailable")
+            # One row past the cap tells a full result from a cut one
+            state = {"truncated": False}
+            source = stream_rows(conn, table, filters, chunk_size, limit=max_rows + 1)
+            chunks = _capped(source, max_rows, state)
+            # An empty result still gets a file with the right columns
+            first = next(chunks, None)
+            if first is None:
+                first = pd.DataFrame(columns=columns)
+            chunks = itertools.chain([first], chunks)
+            if fmt == "Parquet":
+                rows = write_parquet(chunks, path, columns)
+            else:
+                rows = write_csv(chunks, path)
+            # Closes the named cursor before the connection goes back
+            source.close()
+    except Exception:
+        os.remove(path)
+        raise
+    return path, rows, state["truncated"]
@@ -0,0 +1,126 @@
+import pandas as pd
+
+# =============================
+# Column Mapping
+# Sheet headers (as shown in the app) or raw database column names.
+# =============================
+COLUMN_ALIASES = {
+    "Date": "Date",
+    "production_date": "Date",
+    "Station Name": "Station Name",
+    "station_name": "Station Name",
+    "Model Type": "Model Type",
+    "model_type": "Model Type",
+    "Batch Number": "Batch Number",
+    "batch_number": "Batch Number",
+    "Tray Number": "Tray Number",
+    "tray_number": "Tray Number",
+    "Product Line": "Product Line",
+    "product_line": "Product Line",
+    "Supplier": "Supplier",
+    "supplier_name": "Supplier",
+    "OK Quantity": "OK Quantity",
+    "ok_quantity": "OK Quantity",
+    "NG Quantity": "NG Quantity",
+    "ng_quantity": "NG Quantity",
+    "Operator Name": "Operator Name",
+    "operator_name": "Operator Name",
+    "Remarks": "Remarks",
+    "remarks": "Remarks",
+}
+
+RECORD_COLUMNS = list(dict.fromkeys(COLUMN_ALIASES.values()))
+
+REQUIRED_COLUMNS = [
+    "Date", "Station Name", "Model Type", "Batch Number", "Product Line",
+    "Supplier", "OK Quantity", "NG Quantity", "Operator Name",
+]
+
+INT_COLUMNS = ["Batch Number", "Tray Number", "OK Quantity", "NG Quantity"]
+
+# Text columns the table declares NOT NULL
+TEXT_COLUMNS = ["Station Name", "Model Type", "Product Line", "Supplier", "Operator Name"]
+
+EXCEL_EXTENSIONS = (".xlsx", ".xls")
+
+# Row numbers listed per problem in an import error
+MAX_REPORTED_ROWS = 10
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def _sheet_rows(mask):
+    # Index -> row numbers as the operator sees them (header is row 1)
+    rows = [str(i + 2) for i in mask[mask].index[:MAX_REPORTED_ROWS]]
+    more = int(mask.sum()) - len(rows)
+    return ", ".join(rows) + (f" and {more} more" if more > 0 else "")
+
+
+# =============================
+# Chunk Normalisation
+# =============================
+def normalize_chunk(chunk):
+    chunk = chunk.rename(columns=lambda c: COLUMN_ALIASES.get(str(c).strip(), str(c).strip()))
+
+    missing = [c for c in dict.fromkeys(REQUIRED_COLUMNS + TEXT_COLUMNS) if c not in chunk.columns]
+    if missing:
+        raise ImportFormatError(f"Missing columns: {', '.join(missing)}")
+
+    # Completely empty lines (trailing rows of a sheet export) hold no
+    # record; anything else with a blank required field is reported below
+    chunk = chunk.dropna(how="all")
+
+    if "Tray Number" not in chunk.columns:
+        chunk["Tray Number"] = 1
+    if "Remarks" not in chunk.columns:
+        chunk["Remarks"] = None
+    for column in TEXT_COLUMNS + ["Remarks"]:
+        # Empty cells stay NULL instead of becoming the string "nan"
+        values = chunk[column]
+        chunk[column] = values.astype(str).str.strip().where(values.notna(), None)
+    for column in INT_COLUMNS:
+        chunk[column] = pd.to_numeric(chunk[column], errors="coerce").fillna(0).astype("int64")
+    chunk["Date"] = pd.to_datetime(chunk["Date"], errors="coerce")
+
+    blank = {c: chunk[c].isna() | (chunk[c] == "") for c in TEXT_COLUMNS}
+    blank = {c: mask for c, mask in blank.items() if mask.any()}
+    if blank:
+        detail = "; ".join(f"{c}: {int(mask.sum())} row(s), rows {_sheet_rows(mask)}" for c, mask in blank.items())
+        raise ImportFormatError(f"Empty required fields, nothing was imported ({detail})")
+
+    bad_dates = chunk["Date"].isna()
+    if bad_dates.any():
+        raise ImportFormatError(f"{int(bad_dates.sum())} row(s) have an unreadable Date: rows {_sheet_rows(bad_dates)}")
+
+    return chunk
+
+
+def _records(chunk):
+    for row in chunk[RECORD_COLUMNS].itertuples(index=False, name=None):
+        record = dict(zip(RECORD_COLUMNS, row))
+        record["Date"] = record["Date"].to_pydatetime()
+        for column in INT_COLUMNS:
+            record[column] = int(record[column])
+        yield record
+
+
+# =============================
+# Reader
+# =============================
+def read_shift_sheet(uploaded_file, chunk_size=5000):
+    # Yields record dicts for insert_production_records. CSV is parsed in
+    # chunks; Excel has no streaming reader so it is parsed in one go.
+    name = getattr(uploaded_file, "name", str(uploaded_file)).lower()
+
+    if name.endswith(EXCEL_EXTENSIONS):
+        try:
+            chunks = [pd.read_excel(uploaded_file)]
+        except ImportError as e:
+            raise ImportFormatError(f"Excel support is not installed: {e}") from e
+    else:
+        chunks = pd.read_csv(uploaded_file, chunksize=chunk_size)
+
+    for chunk in chunks:
+        yield from _records(normalize_chunk(chunk))
@@ -0,0 +1,131 @@
+import os
+import threading
+
+import pandas as pd
+
+from record_schema import apply_production_schema, concat_production
+
+# =============================
+# Settings
+# =============================
+# Change ids are handed out at insert time but become visible at commit,
+# so a lower id can show up after a higher one was read. The last
+# CHANGE_OVERLAP ids are re-checked on every refresh to catch those.
+CHANGE_OVERLAP = int(os.getenv("DASHBOARD_CHANGE_OVERLAP", "1000"))
+
+# =============================
+# SQL: Incremental Reads
+# =============================
+WATERMARK_QUERY = """
+SELECT
+    (SELECT COALESCE(MIN(change_id), 0) FROM production_data_changes) AS min_change_id,
+    (SELECT COALESCE(MAX(change_id), 0) FROM production_data_changes) AS max_change_id,
+    (SELECT COUNT(*) FROM production_data_changes WHERE change_id > %s) AS recent_changes;
+"""
+
+FULL_LOAD_QUERY = "SELECT * FROM production_data ORDER BY id;"
+
+CHANGED_ROWS_QUERY = "SELECT * FROM production_data WHERE id = ANY(%s) ORDER BY id;"
+
+CHANGES_QUERY = """
+SELECT change_id, record_id, operation
+FROM production_data_changes
+WHERE change_id > %s
+ORDER BY change_id;
+"""
+
+
+def read_records(connection, query, params=None):
+    return apply_production_schema(pd.read_sql(query, connection, params=params))
+
+
+# =============================
+# Incremental Loader
+# =============================
+class IncrementalRecordLoader:
+    # Keeps one copy of production_data per process and only pulls the
+    # rows touched in the change log since the last seen change_id.
+    # The cached frame is shared between sessions: treat it as read-only.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.frame = None
+        self.last_change_id = 0
+        # change ids above the overlap floor that are already applied
+        self.seen_changes = set()
+
+    @property
+    def _floor(self):
+        return max(self.last_change_id - CHANGE_OVERLAP, 0)
+
+    def refresh(self, connection):
+        with self._lock:
+            min_change_id, max_change_id, recent = self._watermarks(connection)
+
+            if (
+                self.frame is None
+                # Change log was dropped/recreated: ids went backwards
+                or max_change_id < self.last_change_id
+                # Entries this process never read were pruned
+                # (db_maintenance)
+                or min_change_id > self.last_change_id + 1
+            ):
+                self._full_load(connection, max_change_id)
+            elif max_change_id > self.last_change_id or recent != len(self.seen_changes):
+                self._apply_delta(connection)
+
+            return self.frame
+
+    def _watermarks(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute(WATERMARK_QUERY, (self._floor,))
+            return cursor.fetchone()
+
+    def _full_load(self, connection, max_change_id):
+        # Changes logged while this runs are replayed on the next refresh;
+        # replaying them is harmless.
+        self.frame = read_records(connection, FULL_LOAD_QUERY)
+        self.last_change_id = max_change_id
+        self.seen_changes = set()
+
+    def _apply_delta(self, connection):
+        changes = pd.read_sql(CHANGES_QUERY, connection, params=(self._floor,))
+        fresh = changes[~changes["change_id"].isin(self.seen_changes)]
+
+        if (fresh["operation"] == "T").any():
+            # Partitions were dropped/detached wholesale
+            self._full_load(connection, int(changes["change_id"].max()))
+            return
+
+        frame = self.frame
+        if len(fresh):
+            # Inserted, updated and deleted rows are all dropped and
+            # re-read by id; a deleted row simply does not come back
+            touched = sorted(int(i) for i in fresh["record_id"].dropna().unique())
+            frame = frame[~frame["id"].isin(touched)]
+            current = read_records(connection, CHANGED_ROWS_QUERY, params=(touched,))
+            if len(current):
+                frame = concat_production([frame, current])
+            self.frame = frame.sort_values("id", ignore_index=True)
+
+        if len(changes):
+            self.last_change_id = max(self.last_change_id, int(changes["change_id"].max()))
+        floor = self._floor
+        self.seen_changes = {int(i) for i in changes["change_id"] if i > floor}
+
+
+# =============================
+# Process-wide Cache
+# =============================
+_record_loader = IncrementalRecordLoader()
+
+
+def get_record_loader():
+    return _record_loader
+
+
+def load_production_records(connection):
+    return _record_loader.refresh(connection)
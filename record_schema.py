@@ -0,0 +1,109 @@
+import os
+
+import pandas as pd
+
+from data_info import CUSTOM_ORDER, MODULE_TYPE_LIST, OPERATOR_LIST, SUPPLIER_LIST
+
+# =============================
+# Settings
+# =============================
+# Arrow-backed strings/ints instead of NumPy object/int columns
+USE_ARROW_DTYPES = os.getenv("DASHBOARD_ARROW_DTYPES", "").strip().lower() in ("1", "true", "yes")
+
+PRODUCT_LINE_LIST = ["Indo #1", "Indo #2"]
+
+# =============================
+# production_data Layout
+# Categorical columns start from the data_info lists, so codes are the
+# same in every load; values missing from the lists are appended.
+# =============================
+CATEGORY_COLUMNS = {
+    "station_name": CUSTOM_ORDER,
+    "model_type": MODULE_TYPE_LIST,
+    "product_line": PRODUCT_LINE_LIST,
+    "supplier_name": SUPPLIER_LIST,
+    "operator_name": OPERATOR_LIST,
+}
+
+# SERIAL/INTEGER columns; quantities can be NULL in the table
+INT_COLUMNS = {
+    "id": "int32",
+    "batch_number": "int32",
+    "tray_number": "int16",
+    "ok_quantity": "int32",
+    "ng_quantity": "int32",
+}
+
+DATETIME_COLUMNS = ["production_date"]
+STRING_COLUMNS = ["remarks", "submission_id"]
+
+
+# =============================
+# Normalisation
+# =============================
+def normalize_labels(values):
+    # Trim and collapse repeated spaces ("Lens CCD  Position Check")
+    return values.astype("string").str.strip().str.replace(r"\s+", " ", regex=True)
+
+
+def normalize_time_labels(values):
+    # "08:00" and "8:00" are the same slot; the sheet uses the short form
+    return values.astype("string").str.strip().str.replace(r"^0(\d):", r"\1:", regex=True)
+
+
+# =============================
+# Categoricals
+# =============================
+def categorical(values, known=()):
+    known = list(dict.fromkeys(known))
+    values = normalize_labels(values)
+    seen = set(known)
+    extra = sorted(v for v in values.dropna().unique() if v not in seen)
+    return pd.Categorical(values, categories=known + extra)
+
+
+def align_categories(frames, columns):
+    # Give every frame the union of categories so concat keeps the dtype
+    frames = [f for f in frames if f is not None]
+    for column in columns:
+        categories = []
+        seen = set()
+        for frame in frames:
+            for value in frame[column].cat.categories:
+                if value not in seen:
+                    seen.add(value)
+                    categories.append(value)
+        frames = [f.assign(**{column: f[column].cat.set_categories(categories)}) for f in frames]
+    return frames
+
+
+# =============================
+# Apply
+# =============================
+def apply_production_schema(frame, arrow=USE_ARROW_DTYPES):
+    # Raw pd.read_sql output -> compact typed frame
+    typed = {}
+    for column, known in CATEGORY_COLUMNS.items():
+        if column in frame.columns:
+            typed[column] = categorical(frame[column], known)
+
+    for column, dtype in INT_COLUMNS.items():
+        if column in frame.columns:
+            values = pd.to_numeric(frame[column], errors="coerce").fillna(0).astype(dtype)
+            typed[column] = values.astype(f"{dtype}[pyarrow]") if arrow else values
+
+    for column in DATETIME_COLUMNS:
+        if column in frame.columns:
+            typed[column] = pd.to_datetime(frame[column], errors="coerce")
+
+    for column in STRING_COLUMNS:
+        if column in frame.columns:
+            typed[column] = frame[column].astype("string[pyarrow]" if arrow else "string")
+
+    return frame.assign(**typed)
+
+
+def concat_production(frames):
+    present = [f for f in frames if f is not None]
+    columns = [c for c in CATEGORY_COLUMNS if all(c in f.columns for f in present)]
+    return pd.concat(align_categories(present, columns), ignore_index=True)
@@ -0,0 +1,82 @@
+from datetime import timedelta
+
+import pandas as pd
+import streamlit as st
+
+from database_connect import get_connection
+from pagination import count_rows, fetch_page, page_cursor
+
+PAGE_SIZES = [25, 50, 100, 200]
+
+
+# =============================
+# Filter Widgets -> SQL Filters
+# =============================
+def filter_widgets(key, filter_columns):
+    # filter_columns: {column: (label, options)}; options == "date" gives
+    # a date range picker, otherwise a multiselect.
+    filters = {}
+    cols = st.columns(len(filter_columns) + 1)
+
+    for col, (column, (label, options)) in zip(cols, filter_columns.items()):
+        with col:
+            if options == "date":
+                picked = st.date_input(label, value=(), key=f"{key}_{column}")
+                if len(picked) == 2:
+                    filters[column] = (picked[0], picked[1] + timedelta(days=1))
+                elif len(picked) == 1:
+                    filters[column] = (picked[0], None)
+            else:
+                picked = st.multiselect(label, options, key=f"{key}_{column}")
+                if picked:
+                    filters[column] = picked
+
+    with cols[-1]:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, index=1, key=f"{key}_page_size")
+
+    return filters, page_size
+
+
+# =============================
+# Paginated Records Table
+# =============================
+def paginated_records(key, table, filter_columns, column_labels=None, height=None):
+    filters, page_size = filter_widgets(key, filter_columns)
+
+    # Cursor stack: cursors[i] is the key of the last row before page i
+    signature = (repr(sorted(filters.items())), page_size)
+    state = st.session_state.setdefault(f"{key}_pager", {"signature": None, "cursors": [None]})
+    if state["signature"] != signature:
+        state["signature"] = signature
+        state["cursors"] = [None]
+
+    with get_connection() as conn:
+        if conn is None:
+            st.error("❌ Database connection failed")
+            return filters, pd.DataFrame()
+        total = count_rows(conn, table, filters)
+        page = fetch_page(conn, table, filters, page_size, after=state["cursors"][-1])
+
+    page_number = len(state["cursors"])
+    page_count = max(1, -(-total // page_size))
+
+    display = page.rename(columns=column_labels) if column_labels else page
+    st.dataframe(display, use_container_width=True, hide_index=True, height=height)
+
+    col_prev, col_info, col_next = st.columns([1, 2, 1])
+    with col_prev:
+        if st.button("◀ Prev", key=f"{key}_prev", disabled=page_number == 1, use_container_width=True):
+            state["cursors"].pop()
+            st.rerun()
+    with col_info:
+        st.markdown(
+            f"<div style='text-align:center; padding-top:6px;'>Page <b>{page_number}</b> of "
+            f"<b>{page_count}</b> · {total:,} records</div>",
+            unsafe_allow_html=True
+        )
+    with col_next:
+        if st.button("Next ▶", key=f"{key}_next", disabled=page_number >= page_count, use_container_width=True):
+            state["cursors"].append(page_cursor(table, page))
+            st.rerun()
+
+    return filters, page
@@ -0,0 +1,37 @@
+import streamlit as st
+
+# =============================
+# Shared Resources
+# Created once per server process and shared by every session and page.
+# Each import happens inside its function, so a page only pays for the
+# resources it actually uses.
+# =============================
+@st.cache_resource(show_spinner=False, validate=lambda pool: pool is not None and not pool.closed)
+def connection_pool():
+    from database_connect import init_connection_pool
+    return init_connection_pool()
+
+
+@st.cache_resource(show_spinner=False, validate=lambda worker: worker.is_alive())
+def sync_worker():
+    from sheet_sync import start_sync_worker
+    return start_sync_worker()
+
+
+@st.cache_resource(show_spinner=False, validate=lambda worker: worker.is_alive())
+def maintenance_worker():
+    from db_maintenance import start_maintenance_worker
+    return start_maintenance_worker()
+
+
+@st.cache_resource(show_spinner=False, validate=lambda resource: resource[1].is_alive())
+def write_queue():
+    # -> (queue, worker)
+    from write_queue import start_write_queue
+    return start_write_queue()
+
+
+@st.cache_resource(show_spinner=False)
+def figure_cache():
+    from figure_cache import get_figure_cache
+    return get_figure_cache()
@@ -0,0 +1,124 @@
+import threading
+
+import pandas as pd
+
+from filter_engine import FilterIndex
+from frame_snapshot import FrameSnapshot
+from ingest_store import get_ingest_store
+from instrumentation import count, timed
+from parallel_agg import parallel_group_sum
+from prepared_frame import align_categories, get_prepared_frame, prepare_rows
+
+# =============================
+# Rollup Layout
+# ISO week columns follow from Date; they ride along as keys so the
+# coarser rollups can be built from the finer ones.
+# =============================
+HOURLY_KEYS = ["Date", "Time", "DateTime", "ISO_Year", "ISO_Week", "Station", "TYPE", "Batch"]
+DAILY_KEYS = ["Date", "ISO_Year", "ISO_Week", "Station", "TYPE", "Batch"]
+WEEKLY_KEYS = ["ISO_Year", "ISO_Week", "Station", "TYPE", "Batch"]
+VALUES = ["OK", "NG"]
+
+
+def _sum(frame, keys):
+    # dropna=False keeps rows whose time slot is not a known slot; the
+    # pivot drops them, the DateTime chart still shows them.
+    return frame.groupby(keys, as_index=False, observed=True, sort=False, dropna=False)[VALUES].sum()
+
+
+def _combine(current, partial, keys):
+    if current is None or current.empty:
+        return partial
+    return _sum(pd.concat(align_categories([current, partial]), ignore_index=True), keys)
+
+
+# =============================
+# Rollup Cache
+# =============================
+class RollupCache:
+    # Hourly (time slot), daily and ISO-weekly OK/NG sums keyed by station,
+    # type and batch. New store rows are folded in as they arrive; only
+    # rows that replace older ones force a rebuild.
+
+    def __init__(self, store):
+        self.store = store
+        self.version = -1
+        self.hourly = self.daily = self.weekly = None
+        self._indexes = {}
+        # Only the hourly level is stored; daily/weekly are cheap from it
+        self.snapshot = FrameSnapshot("rollup_hourly")
+        self._lock = threading.Lock()
+
+    def _restore(self):
+        with timed("rollups.restore"):
+            hourly, manifest = self.snapshot.load(max_version=self.store.version)
+            if hourly is not None:
+                self._derive(hourly)
+                self.version = manifest["version"]
+
+    def refresh(self):
+        with self._lock:
+            if self.version < 0:
+                self._restore()
+            if self.version == self.store.version:
+                return self
+            if self.version >= 0:
+                changes, replaces, version = self.store.changes_since(self.version)
+                if not replaces:
+                    if not changes.empty:
+                        count("rollups.fold")
+                        with timed("rollups.fold"):
+                            self._fold(prepare_rows(changes, self.hourly))
+                    self.version = version
+                    self.snapshot.save_later(self.hourly, version)
+                    return self
+
+            # Rebuild from the shared prepared frame instead of raw rows
+            count("rollups.rebuild")
+            with timed("rollups.rebuild"):
+                prepared = get_prepared_frame()
+                self._rebuild(prepared.frame)
+            self.version = prepared.version
+            self.snapshot.save_later(self.hourly, self.version, force=True)
+            return self
+
+    def index(self, level):
+        # Filter index over "hourly", "daily" or "weekly", rebuilt only
+        # when that rollup frame has been replaced.
+        frame = getattr(self, level)
+        cached = self._indexes.get(level)
+        if cached is None or cached.frame is not frame:
+            columns = ("TYPE", "Batch", "Station", "ISO_Year", "ISO_Week")
+            date_column = "Date" if "Date" in frame.columns else None
+            cached = FilterIndex(frame, columns, date_column)
+            self._indexes[level] = cached
+        return cached
+
+    def _rebuild(self, rows):
+        # The full pass over every prepared row is the expensive one;
+        # large frames are sharded by date across the process pool.
+        self._derive(parallel_group_sum(rows, HOURLY_KEYS, VALUES))
+
+    def _derive(self, hourly):
+        self.hourly = hourly
+        self.daily = _sum(hourly, DAILY_KEYS)
+        self.weekly = _sum(self.daily, WEEKLY_KEYS)
+
+    def _fold(self, rows):
+        hourly = _sum(rows, HOURLY_KEYS)
+        daily = _sum(hourly, DAILY_KEYS)
+        self.hourly = _combine(self.hourly, hourly, HOURLY_KEYS)
+        self.daily = _combine(self.daily, daily, DAILY_KEYS)
+        self.weekly = _combine(self.weekly, _sum(daily, WEEKLY_KEYS), WEEKLY_KEYS)
+
+
+_rollups = None
+_rollups_lock = threading.Lock()
+
+
+def get_rollups():
+    global _rollups
+    with _rollups_lock:
+        if _rollups is None:
+            _rollups = RollupCache(get_ingest_store())
+    return _rollups.refresh()
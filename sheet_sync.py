@@ -0,0 +1,164 @@
+import io
+import os
+import threading
+import time
+from datetime import date, timedelta
+from urllib.request import urlopen
+
+import pandas as pd
+
+from ingest_store import get_ingest_store
+from instrumentation import timed
+
+# =============================
+# Settings
+# =============================
+# sheet    -> Google Sheets CSV export (CSV_URL)
+# csv      -> local CSV file (DASHBOARD_SOURCE_PATH)
+# postgres -> production_data rolled up to the sheet layout
+SOURCE = os.getenv("DASHBOARD_SOURCE", "sheet").strip().lower()
+SOURCE_PATH = os.getenv("DASHBOARD_SOURCE_PATH", "HourlyLineRecord - DataBase Try.csv")
+SYNC_INTERVAL = float(os.getenv("DASHBOARD_SYNC_INTERVAL", "30"))
+FETCH_TIMEOUT = float(os.getenv("DASHBOARD_FETCH_TIMEOUT", "20"))
+# Postgres rows can still be edited for a while after they are entered
+POSTGRES_SYNC_DAYS = int(os.getenv("DASHBOARD_SYNC_DAYS", "2"))
+
+# Google Sheets CSV URL (must be CSV export)
+SHEET_ID = "1oOJu04mdSgeGALFv9orv9LnvTf_HRBOlnLJVv4I07xc"
+GID = "190517020"
+CSV_URL = f"https://docs.google.com/spreadsheets/d/{SHEET_ID}/export?format=csv&gid={GID}"
+
+# {time_slot} is filled with database_connect.TIME_SLOT_SQL
+POSTGRES_SOURCE_QUERY = """
+SELECT
+    production_date::date::text AS "Date",
+    {time_slot} AS "Time",
+    station_name AS "Station",
+    model_type AS "TYPE",
+    batch_number::text AS "Batch",
+    SUM(ok_quantity) AS "OK",
+    SUM(ng_quantity) AS "NG"
+FROM production_data
+WHERE production_date >= %s
+GROUP BY 1, 2, 3, 4, 5;
+"""
+
+
+# =============================
+# Sources
+# =============================
+def fetch_sheet(url=CSV_URL, timeout=FETCH_TIMEOUT):
+    with urlopen(url, timeout=timeout) as response:
+        return pd.read_csv(io.BytesIO(response.read()))
+
+
+def fetch_csv(path=SOURCE_PATH):
+    return pd.read_csv(path)
+
+
+def fetch_postgres(since):
+    # Imported here: the sheet and csv sources never load psycopg2
+    from database_connect import TIME_SLOT_SQL, get_connection
+    from migrations import initialize_database
+
+    with get_connection() as conn:
+        if conn is None:
+            raise ConnectionError("database unavailable")
+        # Also installs the NOTIFY trigger the change listener relies on
+        initialize_database(conn)
+        query = POSTGRES_SOURCE_QUERY.format(time_slot=TIME_SLOT_SQL)
+        return pd.read_sql(query, conn, params=(since,))
+
+
+# =============================
+# Sync Worker
+# =============================
+class SyncWorker(threading.Thread):
+    # Pulls the source into the local ingest store in the background so
+    # dashboard reruns never wait on the sheet.
+
+    def __init__(self, store, source=SOURCE, interval=SYNC_INTERVAL):
+        super().__init__(name="dashboard-sync", daemon=True)
+        self.store = store
+        self.source = source
+        self.interval = interval
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._full_synced = False
+        self.status = {
+            "source": source,
+            "syncs": 0,
+            "rows_written": 0,
+            "last_sync": None,
+            "last_duration": None,
+            "last_error": None,
+        }
+
+    def fetch(self):
+        if self.source == "sheet":
+            return fetch_sheet()
+        if self.source == "csv":
+            return fetch_csv()
+        if self.source == "postgres":
+            since = date.min if not self._full_synced else date.today() - timedelta(days=POSTGRES_SYNC_DAYS)
+            return fetch_postgres(since)
+        raise ValueError(f"Unknown dashboard source: {self.source}")
+
+    def sync_once(self):
+        started = time.monotonic()
+        try:
+            with timed(f"sync.fetch.{self.source}"):
+                raw = self.fetch()
+            with timed("sync.store_append"):
+                written = self.store.append(raw)
+        except Exception as e:
+            # Keep serving whatever is already in the store
+            print(f"❌ Dashboard sync error: {e}")
+            self.status["last_error"] = str(e)
+            return 0
+
+        self._full_synced = True
+        self.status["syncs"] += 1
+        self.status["rows_written"] += written
+        self.status["last_sync"] = time.time()
+        self.status["last_duration"] = time.monotonic() - started
+        self.status["last_error"] = None
+        return written
+
+    def run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if not self._stopped.is_set():
+                self.sync_once()
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def start_sync_worker():
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = SyncWorker(get_ingest_store())
+            if _worker.store.version == 0:
+                # Nothing on disk yet: the first page needs something to show
+                _worker.sync_once()
+            else:
+                _worker.wake()
+            _worker.start()
+
+            if _worker.source == "postgres":
+                from change_listener import start_change_listener
+
+                # Sync as soon as rows are written instead of on the next tick
+                start_change_listener(_worker.wake)
+        return _worker
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+ROW_TOTAL = "Total per Time"
+GRAND_TOTAL = "Grand Total"
+
+
+# =============================
+# Summary Table
+# =============================
+def summary_table(frame, rows, columns, values, row_order, column_order):
+    # Numeric rows x columns sums plus a total column and a grand total row,
+    # all from one bincount. Every row in row_order is kept; only columns
+    # with data are kept, in column_order. Values outside either order are
+    # left out, as pivot_table + reindex did.
+    row_codes = pd.Categorical(frame[rows], categories=row_order).codes
+    col_codes = pd.Categorical(frame[columns], categories=column_order).codes
+    valid = (row_codes >= 0) & (col_codes >= 0)
+    row_codes = row_codes[valid].astype(np.int64)
+    col_codes = col_codes[valid].astype(np.int64)
+    weights = frame[values].to_numpy()[valid]
+
+    n_rows, n_cols = len(row_order), len(column_order)
+    grid = np.bincount(
+        row_codes * n_cols + col_codes,
+        weights=weights,
+        minlength=n_rows * n_cols,
+    ).reshape(n_rows, n_cols).round().astype(np.int64)
+
+    present = np.bincount(col_codes, minlength=n_cols) > 0
+    grid = grid[:, present]
+
+    body = np.column_stack([grid, grid.sum(axis=1)])
+    table = np.vstack([body, body.sum(axis=0)])
+
+    return pd.DataFrame(
+        table,
+        index=pd.Index(list(row_order) + [GRAND_TOTAL], name=rows),
+        columns=[c for c, keep in zip(column_order, present) if keep] + [ROW_TOTAL],
+    )
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import parallel_agg
+from prepared_frame import CUSTOM_ORDER_TIME, prepare_rows
+from rollups import HOURLY_KEYS, VALUES, _sum
+
+
+@pytest.fixture
+def prepared():
+    rng = np.random.default_rng(7)
+    rows = 5000
+    days = pd.date_range("2025-01-01", periods=30, freq="D")
+    raw = pd.DataFrame({
+        "Date": days[rng.integers(0, len(days), rows)].strftime("%Y-%m-%d"),
+        "Time": np.array(CUSTOM_ORDER_TIME)[rng.integers(0, len(CUSTOM_ORDER_TIME), rows)],
+        "Station": np.array(["Packing", "Lens CCD Position Check", "Check Connector"])[rng.integers(0, 3, rows)],
+        "TYPE": np.array(["TX", "RX"])[rng.integers(0, 2, rows)],
+        "Batch": np.array(["Batch 1", "batch2", "BATCH 3"])[rng.integers(0, 3, rows)],
+        "OK": rng.integers(0, 500, rows),
+        "NG": rng.integers(0, 20, rows),
+    })
+    return prepare_rows(raw)
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(parallel_agg, "PARALLEL_MIN_ROWS", 0)
+    yield
+    parallel_agg.shutdown_executor()
+
+
+def _sorted(frame):
+    return frame.sort_values(HOURLY_KEYS, ignore_index=True)
+
+
+def test_parallel_matches_serial(prepared, pool, capsys):
+    parallel = parallel_agg.parallel_group_sum(prepared, HOURLY_KEYS, VALUES, workers=2)
+
+    # The fallback prints an error; the pool has to have done the work
+    assert "Parallel aggregation error" not in capsys.readouterr().out
+    pd.testing.assert_frame_equal(_sorted(parallel), _sorted(_sum(prepared, HOURLY_KEYS)))
+
+
+def test_shared_memory_round_trip(prepared):
+    shm, size = parallel_agg._to_shared_memory(prepared)
+    try:
+        partial = parallel_agg._sum_shard(shm.name, size, HOURLY_KEYS, VALUES)
+    finally:
+        shm.close()
+        shm.unlink()
+    assert partial["OK"].sum() == prepared["OK"].sum()
@@ -0,0 +1,260 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from datetime import datetime
+
+from psycopg2 import DataError, IntegrityError
+
+from database_connect import get_connection, insert_production_records
+from pagination import invalidate_counts
+from record_import import TEXT_COLUMNS
+
+# =============================
+# Settings
+# =============================
+QUEUE_PATH = os.getenv("DASHBOARD_WRITE_QUEUE", os.path.join(".cache", "write_queue.sqlite3"))
+BATCH_SIZE = int(os.getenv("DASHBOARD_WRITE_BATCH", "500"))
+# Submissions at the end of a slot arrive together; wait briefly so they
+# go out as one insert
+COALESCE_SECONDS = 0.2
+IDLE_SECONDS = 5.0
+MAX_BACKOFF = 60.0
+# Committed entries are kept this long so their status can still be shown
+KEEP_COMMITTED_SECONDS = 24 * 3600
+
+CREATE_QUEUE_QUERY = """
+CREATE TABLE IF NOT EXISTS pending_records (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    record TEXT NOT NULL,
+    queued_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    committed_at REAL,
+    rejected_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_pending_records_open
+    ON pending_records (committed_at, rejected_at, id);
+"""
+
+
+# =============================
+# Durable Queue
+# =============================
+class WriteQueue:
+    # SQLite (WAL) backed queue of production records waiting for
+    # Postgres. A record is on disk before the operator sees "queued".
+
+    def __init__(self, path=QUEUE_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as db:
+            db.execute("PRAGMA journal_mode=WAL;")
+            db.executescript(CREATE_QUEUE_QUERY)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def enqueue(self, record):
+        # -> ticket id. The entry time is stamped now, not when the insert
+        # finally reaches Postgres. The submission id makes a retried
+        # insert of an already committed record a no-op.
+        record = dict(record)
+        record.setdefault("Date", datetime.now().isoformat(sep=" ", timespec="seconds"))
+        record.setdefault("Submission ID", str(uuid.uuid4()))
+        with closing(self._connect()) as db, db:
+            cursor = db.execute(
+                "INSERT INTO pending_records (record, queued_at) VALUES (?, ?);",
+                (json.dumps(record, default=str), time.time()),
+            )
+            return cursor.lastrowid
+
+    def next_batch(self, limit=BATCH_SIZE):
+        with closing(self._connect()) as db:
+            rows = db.execute(
+                "SELECT id, record FROM pending_records "
+                "WHERE committed_at IS NULL AND rejected_at IS NULL ORDER BY id LIMIT ?;",
+                (limit,),
+            ).fetchall()
+        return [(row_id, json.loads(record)) for row_id, record in rows]
+
+    def mark_committed(self, ids):
+        now = time.time()
+        with closing(self._connect()) as db, db:
+            db.executemany(
+                "UPDATE pending_records SET committed_at = ?, last_error = NULL WHERE id = ?;",
+                [(now, row_id) for row_id in ids],
+            )
+            db.execute(
+                "DELETE FROM pending_records WHERE committed_at < ? OR rejected_at < ?;",
+                (now - KEEP_COMMITTED_SECONDS, now - KEEP_COMMITTED_SECONDS),
+            )
+
+    def mark_failed(self, ids, error):
+        with closing(self._connect()) as db, db:
+            db.executemany(
+                "UPDATE pending_records SET attempts = attempts + 1, last_error = ? WHERE id = ?;",
+                [(str(error), row_id) for row_id in ids],
+            )
+
+    def mark_rejected(self, row_id, error):
+        # Postgres refused the row itself; retrying cannot help
+        with closing(self._connect()) as db, db:
+            db.execute(
+                "UPDATE pending_records SET rejected_at = ?, last_error = ? WHERE id = ?;",
+                (time.time(), str(error), row_id),
+            )
+
+    def status(self, ticket):
+        # -> {"state": "queued" | "committed" | "rejected" | "unknown", ...}
+        with closing(self._connect()) as db:
+            row = db.execute(
+                "SELECT attempts, last_error, committed_at, rejected_at FROM pending_records WHERE id = ?;",
+                (ticket,),
+            ).fetchone()
+        if row is None:
+            return {"state": "unknown"}
+        attempts, last_error, committed_at, rejected_at = row
+        if committed_at is not None:
+            state = "committed"
+        elif rejected_at is not None:
+            state = "rejected"
+        else:
+            state = "queued"
+        return {
+            "state": state,
+            "attempts": attempts,
+            "last_error": last_error,
+        }
+
+    def pending_count(self):
+        with closing(self._connect()) as db:
+            return db.execute(
+                "SELECT COUNT(*) FROM pending_records WHERE committed_at IS NULL AND rejected_at IS NULL;"
+            ).fetchone()[0]
+
+
+# =============================
+# Drain Worker
+# =============================
+class WriteQueueWorker(threading.Thread):
+    # Drains the queue into production_data in batches; on failure the
+    # batch stays queued and is retried with exponential backoff. Records
+    # already in the table (same submission id) are skipped on retry.
+
+    def __init__(self, queue):
+        super().__init__(name="write-queue", daemon=True)
+        self.queue = queue
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self.status = {
+            "batches": 0,
+            "committed": 0,
+            "last_commit": None,
+            "last_error": None,
+            "backoff": 0.0,
+        }
+
+    def drain_once(self):
+        # -> number of queue entries handled. Not the rows inserted: a
+        # batch of retried duplicates inserts nothing but still drains.
+        batch = self.queue.next_batch()
+        if not batch:
+            return 0
+        ids = [row_id for row_id, _ in batch]
+        try:
+            with get_connection() as conn:
+                if conn is None:
+                    raise ConnectionError("database unavailable")
+                try:
+                    inserted = insert_production_records(conn, (record for _, record in batch))
+                except (DataError, IntegrityError):
+                    # One bad row fails the whole batch: insert one at a
+                    # time and set aside the rows Postgres rejects
+                    inserted, ids = self._insert_each(conn, batch)
+        except Exception as e:
+            print(f"❌ Write queue error: {e}")
+            self.queue.mark_failed(ids, e)
+            self.status["last_error"] = str(e)
+            raise
+
+        self.queue.mark_committed(ids)
+        invalidate_counts("production_data")
+        self.status["batches"] += 1
+        self.status["committed"] += inserted
+        self.status["last_commit"] = time.time()
+        self.status["last_error"] = None
+        return len(batch)
+
+    def _insert_each(self, conn, batch):
+        # Each row is its own transaction, so it is marked as soon as it
+        # commits: a later failure only requeues the rows still pending
+        inserted = 0
+        for row_id, record in batch:
+            try:
+                inserted += insert_production_records(conn, [record])
+            except (DataError, IntegrityError) as e:
+                self.queue.mark_rejected(row_id, e)
+                continue
+            self.queue.mark_committed([row_id])
+        return inserted, []
+
+    def run(self):
+        backoff = 0.0
+        while not self._stopped.is_set():
+            try:
+                drained = self.drain_once()
+                backoff = 0.0
+            except Exception:
+                backoff = min(max(backoff * 2, 1.0), MAX_BACKOFF)
+                self.status["backoff"] = backoff
+                self._stopped.wait(backoff)
+                continue
+
+            self.status["backoff"] = 0.0
+            if drained < BATCH_SIZE:
+                # Caught up: sleep until the next submission
+                self._wake.wait(IDLE_SECONDS)
+                self._wake.clear()
+                self._stopped.wait(COALESCE_SECONDS)
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+
+
+_queue = None
+_worker = None
+_queue_lock = threading.Lock()
+
+
+def start_write_queue():
+    # -> (queue, worker); one per process
+    global _queue, _worker
+    with _queue_lock:
+        if _queue is None:
+            _queue = WriteQueue()
+        if _worker is None or not _worker.is_alive():
+            _worker = WriteQueueWorker(_queue)
+            _worker.start()
+        return _queue, _worker
+
+
+def submit_record(record):
+    # -> ticket id; returns as soon as the record is on local disk
+    missing = [column for column in TEXT_COLUMNS if not record.get(column)]
+    if missing:
+        raise ValueError(f"Missing fields: {', '.join(missing)}")
+
+    queue, worker = start_write_queue()
+    ticket = queue.enqueue(record)
+    worker.wake()
+    return ticket